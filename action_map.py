@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Action mapping
+==============
+Mental command -> effect mapping, read from `action_map.json` instead of
+per-file if/elif chains. Each entry point has its own section:
+
+    "mouse_demo_enhanced": {
+        "threshold": 0.5,              # power must exceed this (null = always, "auto" = adaptive)
+        "gain": "linear",              # power -> speed factor, see below
+        "actions": {
+            "left": {"move": [-1, 0]},
+            "push": {"click": "left"},
+            "lift": {"key": "space", "threshold": 0.7},
+            "pull": {"call": "spotify:next_track"}
+        }
+    }
+
+Gain curves: "step" (1.0 above threshold), "linear", {"exponent": e} or
+{"points": [[power, gain], ...]} (piecewise linear). They are sampled into a
+lookup table at compile time.
+
+A threshold of "auto" uses the per-action level learned by an
+`AdaptiveThresholds` (see thresholds.py), passed as `thresholds=`.
+
+The section is compiled into a dict of `Binding`s, so the per-frame cost is
+one dict lookup and a threshold compare. `watch()` reloads the file when it
+changes; a broken file is reported and the previous table stays active.
+
+    actions = ActionMap('main', cursor=cursor)
+    actions.watch()
+    binding = actions.lookup(action, power)
+    if binding is not None:
+        binding.fire(power)           # click / key / callable
+"""
+
+import importlib
+import json
+import os
+import threading
+
+DEFAULT_CONFIG = os.getenv('ACTION_MAP_CONFIG',
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), 'action_map.json'))
+RELOAD_INTERVAL = 1.0    # seconds between config file checks
+GAIN_STEPS = 100         # gain lookup table resolution (entries per unit power)
+AUTO = 'auto'            # threshold value for adaptive per-action levels
+
+
+def gain_table(spec, steps=GAIN_STEPS):
+    """Sample a gain curve spec into a tuple of steps + 1 values over power 0..1."""
+    powers = [i / steps for i in range(steps + 1)]
+    if spec in (None, 'step'):
+        return tuple(1.0 for _ in powers)
+    if spec == 'linear':
+        return tuple(powers)
+    if isinstance(spec, dict) and 'exponent' in spec:
+        exponent = float(spec['exponent'])
+        return tuple(p ** exponent for p in powers)
+    if isinstance(spec, dict) and 'points' in spec:
+        points = sorted((float(p), float(g)) for p, g in spec['points'])
+        if not points:
+            raise ValueError('gain points must not be empty')
+        table = []
+        for p in powers:
+            if p <= points[0][0]:
+                table.append(points[0][1])
+            elif p >= points[-1][0]:
+                table.append(points[-1][1])
+            else:
+                for (p0, g0), (p1, g1) in zip(points, points[1:]):
+                    if p0 <= p <= p1:
+                        table.append(g0 + (g1 - g0) * (p - p0) / (p1 - p0) if p1 > p0 else g1)
+                        break
+        return tuple(table)
+    raise ValueError(f"Unknown gain curve {spec!r}; use step, linear, {{'exponent': e}} or {{'points': [...]}}")
+
+
+class Binding:
+    """Compiled mapping for one mental command."""
+
+    __slots__ = ('action', 'move', 'click', 'key', 'call', 'threshold', 'adaptive', 'gains', 'effects')
+
+    def __init__(self, action, move=None, click=None, key=None, call=None, threshold=None,
+                 gains=None, cursor=None):
+        self.action = action
+        self.move = tuple(move) if move else None
+        self.click = click
+        self.key = key
+        self.call = call
+        self.adaptive = threshold == AUTO
+        self.threshold = None if self.adaptive else threshold
+        self.gains = gains or gain_table(None)
+
+        # Discrete effects, bound once so firing is a plain loop
+        effects = []
+        if click:
+            effects.append(lambda power: cursor.click(click))
+        if key:
+            effects.append(lambda power: cursor.press(key))
+        if call:
+            effects.append(lambda power: call(action, power))
+        self.effects = tuple(effects)
+
+    def gain(self, power):
+        """Speed factor for `power`, from the compiled lookup table."""
+        steps = len(self.gains) - 1
+        return self.gains[min(max(int(power * steps + 0.5), 0), steps)]
+
+    def fire(self, power):
+        """Run the discrete effects (click, key press, callable)."""
+        for effect in self.effects:
+            effect(power)
+
+    def __repr__(self):
+        parts = [f'{name}={getattr(self, name)!r}' for name in ('move', 'click', 'key', 'threshold')
+                 if getattr(self, name) is not None]
+        if self.adaptive:
+            parts.append('threshold=auto')
+        return f"Binding({self.action!r}, {', '.join(parts)})"
+
+
+def resolve_callable(name, registry=None):
+    """Find a callable by registry name or 'module:attribute'."""
+    if registry and name in registry:
+        return registry[name]
+    module, _, attr = name.partition(':')
+    if not attr:
+        raise ValueError(f"Unknown callable {name!r}; register it or use 'module:function'")
+    return getattr(importlib.import_module(module), attr)
+
+
+def compile_section(section, cursor=None, callables=None, thresholds=None):
+    """Compile one config section into {action: Binding}."""
+    default_threshold = section.get('threshold')
+    default_gain = section.get('gain')
+    table = {}
+    for action, spec in section.get('actions', {}).items():
+        if isinstance(spec, list):
+            spec = {'move': spec}
+        unknown = set(spec) - {'move', 'click', 'key', 'call', 'threshold', 'gain'}
+        if unknown:
+            raise ValueError(f"Action {action!r}: unknown keys {sorted(unknown)}")
+        if (spec.get('click') or spec.get('key')) and cursor is None:
+            raise ValueError(f"Action {action!r} clicks or presses keys but no cursor was given")
+        move = spec.get('move')
+        if move is not None and len(move) != 2:
+            raise ValueError(f"Action {action!r}: move must be [dx, dy]")
+        threshold = spec.get('threshold', default_threshold)
+        if threshold == AUTO and thresholds is None:
+            raise ValueError(f"Action {action!r} has an adaptive threshold but no thresholds were given")
+        if threshold not in (None, AUTO) and not isinstance(threshold, (int, float)):
+            raise ValueError(f"Action {action!r}: threshold must be a number, null or {AUTO!r}")
+        call = spec.get('call')
+        table[action] = Binding(
+            action,
+            move=move,
+            click=spec.get('click'),
+            key=spec.get('key'),
+            call=resolve_callable(call, callables) if call else None,
+            threshold=threshold,
+            gains=gain_table(spec.get('gain', default_gain)),
+            cursor=cursor,
+        )
+    return table
+
+
+class ActionMap:
+    """Hot-reloadable dispatch table for one entry point's config section."""
+
+    def __init__(self, section, path=DEFAULT_CONFIG, cursor=None, callables=None, thresholds=None):
+        self.section = section
+        self.path = path
+        self.cursor = cursor
+        self.callables = callables
+        self.thresholds = thresholds
+        self.table = {}
+        self.reloads = 0
+        self._mtime = None
+        self._callbacks = []
+        self._stop = threading.Event()
+        self._thread = None
+        self.load()
+
+    # ---- Lookups ----
+    def lookup(self, action, power):
+        """Binding for `action` if `power` passes its threshold, else None."""
+        binding = self.table.get(action)
+        if binding is None:
+            return None
+        limit = self.thresholds.threshold(action) if binding.adaptive else binding.threshold
+        if limit is not None and power <= limit:
+            return None
+        return binding
+
+    def directions(self):
+        """{action: (dx, dy)} for every moving action (MotionEngine format)."""
+        return {action: b.move for action, b in self.table.items() if b.move}
+
+    # ---- Loading ----
+    def load(self):
+        """Compile the section; the new table replaces the old one atomically."""
+        mtime = os.path.getmtime(self.path)
+        with open(self.path) as f:
+            config = json.load(f)
+        if self.section not in config:
+            raise KeyError(f"No section {self.section!r} in {self.path}")
+        self.table = compile_section(config[self.section], self.cursor, self.callables, self.thresholds)
+        self._mtime = mtime
+        return self.table
+
+    def on_reload(self, callback):
+        """Call `callback(action_map)` after every successful reload."""
+        self._callbacks.append(callback)
+        return callback
+
+    def check(self):
+        """Reload if the file changed; True if a new table was installed."""
+        try:
+            if os.path.getmtime(self.path) == self._mtime:
+                return False
+            self.load()
+        except Exception as e:
+            # keep running on the previous table; remember the mtime so we don't spam
+            self._mtime = os.path.getmtime(self.path) if os.path.exists(self.path) else None
+            print(f"[ActionMap] Keeping previous mapping, {self.path} is invalid: {e}")
+            return False
+        self.reloads += 1
+        print(f"[ActionMap] Reloaded {self.section!r}: {sorted(self.table)}")
+        for callback in self._callbacks:
+            callback(self)
+        return True
+
+    def watch(self, interval=RELOAD_INTERVAL):
+        """Check the config file for changes every `interval` seconds."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch_loop, args=(interval,),
+                                        name='ActionMapWatcher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _watch_loop(self, interval):
+        while not self._stop.wait(interval):
+            self.check()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Command actuator
+================
+Keeps slow OS work (cursor moves, clicks, key presses) off the Cortex
+websocket thread. The stream handler only calls `submit()`, which stores the
+command in a single-slot coalescing queue and returns immediately; a
+dedicated worker thread takes the freshest command and acts on it. Commands
+that were replaced before the worker got to them are dropped and counted.
+
+    worker = ActuatorWorker(handle_command, repeat_interval=DURATION)
+    worker.start()
+    ...
+    worker.submit((action, power))      # from on_new_com_data
+
+A repeated command expires `max_hold` seconds after its last `submit()`, so
+the cursor stops when the com stream does instead of moving forever.
+Run this file directly to check that repeats stop.
+"""
+
+import queue
+import threading
+import time
+
+MAX_HOLD = 0.5    # seconds a command keeps repeating without a new submit (4 com frames at 8 Hz)
+
+
+class CoalescingQueue:
+    """Single-slot queue: `put` replaces any item that was not taken yet."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._full = False
+        self._closed = False
+        self.puts = 0
+        self.coalesced = 0
+
+    def put(self, item):
+        with self._cond:
+            if self._full:
+                self.coalesced += 1
+            self._item = item
+            self._full = True
+            self.puts += 1
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Take the newest item; raises queue.Empty on timeout or when closed."""
+        with self._cond:
+            if not self._full and not self._closed:
+                self._cond.wait(timeout)
+            if not self._full:
+                raise queue.Empty
+            item = self._item
+            self._item = None
+            self._full = False
+            return item
+
+    def close(self):
+        """Wake any waiting consumer."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+
+class ActuatorWorker:
+    """Runs `handler(command)` on its own thread for the freshest command.
+
+    With `repeat_interval` set, the last command is re-applied at that
+    interval until a new one arrives, which gives held commands (e.g. keep
+    moving left) their continuous effect. Repeats stop `max_hold` seconds
+    after the last submit (None repeats until the next command).
+    """
+
+    def __init__(self, handler, repeat_interval=None, max_hold=MAX_HOLD, name='ActuatorWorker'):
+        self.handler = handler
+        self.repeat_interval = repeat_interval
+        self.max_hold = max_hold
+        self.name = name
+        self.queue = CoalescingQueue()
+        self.handled = 0
+        self.repeats = 0
+        self.expired = 0
+        self.errors = 0
+        self._thread = None
+
+    def submit(self, command):
+        """Hand a command to the worker; never blocks."""
+        self.queue.put(command)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        """Stop the worker; may also be called from inside the handler."""
+        self.queue.close()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        last = None
+        last_at = 0.0
+        while not self.queue.closed:
+            try:
+                command = self.queue.get(self.repeat_interval if last is not None else None)
+                last_at = time.monotonic()
+            except queue.Empty:
+                if self.queue.closed or last is None:
+                    continue
+                if self.max_hold is not None and time.monotonic() - last_at >= self.max_hold:
+                    # no new command for max_hold: the held command is stale
+                    last = None
+                    self.expired += 1
+                    continue
+                command = last
+                self.repeats += 1
+            last = command
+            try:
+                self.handler(command)
+                self.handled += 1
+            except Exception as e:
+                self.errors += 1
+                print(f"[Actuator] Error handling {command!r}: {e}")
+
+    def stats(self):
+        return {
+            'submitted': self.queue.puts,
+            'coalesced': self.queue.coalesced,
+            'handled': self.handled,
+            'repeats': self.repeats,
+            'expired': self.expired,
+            'errors': self.errors,
+        }
+
+
+if __name__ == "__main__":
+    # A held command repeats every 10 ms while submits keep coming, then
+    # stops max_hold after the last one.
+    calls = []
+    worker = ActuatorWorker(lambda command: calls.append(time.monotonic()), repeat_interval=0.01)
+    worker.start()
+    for _ in range(4):
+        last_submit = time.monotonic()
+        worker.submit(('left', 0.8))
+        time.sleep(0.125)       # 8 Hz com
+    time.sleep(MAX_HOLD + 0.5)
+    worker.stop()
+
+    after = [t - last_submit for t in calls if t > last_submit]
+    stats = worker.stats()
+    print(f"{stats['handled']} handled ({stats['repeats']} repeats), {stats['expired']} expired")
+    print(f"last repeat {after[-1] * 1000:.0f} ms after the last submit (max_hold {MAX_HOLD * 1000:.0f} ms)")
+    assert stats['expired'] == 1 and after[-1] < MAX_HOLD + 0.05, 'repeats did not stop'
+    print("repeats stopped")
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Cursor backends
+===============
+One small interface for everything that touches the OS cursor, so control
+loops do not call `pyautogui` directly:
+
+- `PyAutoGUIBackend`: the cross-platform default.
+- `XlibBackend`: direct X11 path through the XTEST extension. Moves and clicks
+  are buffered and flushed without waiting for a server round trip.
+- `VirtualBackend`: an in-memory screen that records every call. Needs no
+  display, so control loops can be tested and benchmarked headless.
+
+Pick one with `get_backend()`; the `VIRTUAL_CURSOR_BACKEND` environment
+variable (`auto`, `pyautogui`, `xlib`, `virtual`) overrides the default.
+"""
+
+import os
+import sys
+import time
+from abc import ABC, abstractmethod
+
+DEFAULT_BACKEND = 'auto'
+VIRTUAL_SCREEN_SIZE = (1920, 1080)
+
+
+class CursorBackend(ABC):
+    """Interface: position, size, absolute/relative moves, clicks and key presses.
+
+    A subclass missing one of the abstract methods fails when it is created,
+    not on first use.
+    """
+
+    name = 'base'
+
+    @abstractmethod
+    def position(self):
+        raise NotImplementedError
+
+    def real_position(self):
+        """Where the OS cursor actually is; wrappers that cache or defer moves bypass that."""
+        return self.position()
+
+    @abstractmethod
+    def size(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def move_to(self, x, y):
+        raise NotImplementedError
+
+    def move_rel(self, dx, dy):
+        x, y = self.position()
+        self.move_to(x + dx, y + dy)
+
+    @abstractmethod
+    def click(self, button='left'):
+        raise NotImplementedError
+
+    @abstractmethod
+    def press(self, key):
+        """Press and release a key (pyautogui key names)."""
+        raise NotImplementedError
+
+    def set_failsafe(self, enabled):
+        """Enable/disable the corner fail-safe where the backend has one."""
+
+
+class PyAutoGUIBackend(CursorBackend):
+    """Cursor control through pyautogui."""
+
+    name = 'pyautogui'
+
+    def __init__(self, pause=0.0):
+        import pyautogui
+        self._pg = pyautogui
+        # pyautogui sleeps PAUSE seconds after every call (0.1 s by default)
+        pyautogui.PAUSE = pause
+
+    def position(self):
+        x, y = self._pg.position()
+        return x, y
+
+    def size(self):
+        width, height = self._pg.size()
+        return width, height
+
+    def move_to(self, x, y):
+        self._pg.moveTo(x, y, duration=0)
+
+    def move_rel(self, dx, dy):
+        self._pg.moveRel(dx, dy, duration=0)
+
+    def click(self, button='left'):
+        self._pg.click(button=button)
+
+    def press(self, key):
+        self._pg.press(key)
+
+    def set_failsafe(self, enabled):
+        self._pg.FAILSAFE = enabled
+
+
+class XlibBackend(CursorBackend):
+    """Direct X11 cursor control via python-xlib and the XTEST extension."""
+
+    name = 'xlib'
+    BUTTONS = {'left': 1, 'middle': 2, 'right': 3}
+    # pyautogui key names whose X keysym is spelled differently
+    KEYSYMS = {'enter': 'Return', 'return': 'Return', 'esc': 'Escape', 'escape': 'Escape',
+               'tab': 'Tab', 'backspace': 'BackSpace', 'delete': 'Delete', 'up': 'Up',
+               'down': 'Down', 'left': 'Left', 'right': 'Right', 'pageup': 'Prior',
+               'pagedown': 'Next', 'home': 'Home', 'end': 'End', 'playpause': 'XF86AudioPlay',
+               'nexttrack': 'XF86AudioNext', 'prevtrack': 'XF86AudioPrev'}
+
+    def __init__(self, display_name=None):
+        from Xlib import X, XK, display
+        from Xlib.ext import xtest
+        self._X = X
+        self._XK = XK
+        self._xtest = xtest
+        self.display = display.Display(display_name)
+        if not self.display.has_extension('XTEST'):
+            raise RuntimeError('X server does not support the XTEST extension')
+        self.root = self.display.screen().root
+
+    def position(self):
+        pointer = self.root.query_pointer()
+        return pointer.root_x, pointer.root_y
+
+    def size(self):
+        screen = self.display.screen()
+        return screen.width_in_pixels, screen.height_in_pixels
+
+    def move_to(self, x, y):
+        self._xtest.fake_input(self.display, self._X.MotionNotify, x=int(x), y=int(y))
+        self.display.flush()
+
+    def move_rel(self, dx, dy):
+        # relative motion needs no position query
+        self._xtest.fake_input(self.display, self._X.MotionNotify, detail=True, x=int(dx), y=int(dy))
+        self.display.flush()
+
+    def click(self, button='left'):
+        code = self.BUTTONS[button]
+        self._xtest.fake_input(self.display, self._X.ButtonPress, code)
+        self._xtest.fake_input(self.display, self._X.ButtonRelease, code)
+        self.display.flush()
+
+    def press(self, key):
+        keysym = self._XK.string_to_keysym(self.KEYSYMS.get(key, key))
+        code = self.display.keysym_to_keycode(keysym)
+        if not code:
+            raise ValueError(f'No key code for {key!r}')
+        self._xtest.fake_input(self.display, self._X.KeyPress, code)
+        self._xtest.fake_input(self.display, self._X.KeyRelease, code)
+        self.display.flush()
+
+
+class VirtualBackend(CursorBackend):
+    """In-memory screen that records every call; no display required."""
+
+    name = 'virtual'
+
+    def __init__(self, size=VIRTUAL_SCREEN_SIZE, position=None, record=True):
+        self.width, self.height = size
+        if position is None:
+            position = (self.width // 2, self.height // 2)
+        self.x, self.y = position
+        self.record = record
+        self.calls = []          # (method, args, perf_counter timestamp)
+        self.clicks = 0
+        self.failsafe = True
+
+    def _log(self, method, *args):
+        if self.record:
+            self.calls.append((method, args, time.perf_counter()))
+
+    def _clamp(self, x, y):
+        return (min(max(int(x), 0), self.width - 1),
+                min(max(int(y), 0), self.height - 1))
+
+    def position(self):
+        self._log('position')
+        return self.x, self.y
+
+    def size(self):
+        self._log('size')
+        return self.width, self.height
+
+    def move_to(self, x, y):
+        self._log('move_to', x, y)
+        self.x, self.y = self._clamp(x, y)
+
+    def move_rel(self, dx, dy):
+        self._log('move_rel', dx, dy)
+        self.x, self.y = self._clamp(self.x + dx, self.y + dy)
+
+    def click(self, button='left'):
+        self._log('click', button)
+        self.clicks += 1
+
+    def press(self, key):
+        self._log('press', key)
+
+    def set_failsafe(self, enabled):
+        self.failsafe = enabled
+
+    def count(self, method):
+        """Number of recorded calls to `method`."""
+        return sum(1 for call in self.calls if call[0] == method)
+
+
+def _xlib_available():
+    if not sys.platform.startswith('linux') or not os.environ.get('DISPLAY'):
+        return False
+    try:
+        import Xlib.ext.xtest  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def get_backend(name=None, **kwargs):
+    """Create a cursor backend by name; `auto` prefers the direct X11 path."""
+    name = name or os.getenv('VIRTUAL_CURSOR_BACKEND', DEFAULT_BACKEND)
+    if name == 'auto':
+        if _xlib_available():
+            try:
+                return XlibBackend()
+            except Exception as e:
+                print(f"Note: X11 backend unavailable ({e}); falling back to pyautogui.")
+        return PyAutoGUIBackend()
+    if name == 'pyautogui':
+        return PyAutoGUIBackend(**kwargs)
+    if name == 'xlib':
+        return XlibBackend(**kwargs)
+    if name == 'virtual':
+        return VirtualBackend(**kwargs)
+    raise ValueError(f"Unknown cursor backend {name!r}; use auto, pyautogui, xlib or virtual")
+
+
+if __name__ == "__main__":
+    # Per-call cost of each backend that can be created here.
+    calls = 2000
+    for name in ('virtual', 'xlib', 'pyautogui'):
+        try:
+            backend = get_backend(name)
+        except Exception as e:
+            print(f"{name:<10} unavailable: {e}")
+            continue
+        backend.set_failsafe(False)
+        x, y = backend.position()
+        for method, call in (('position', backend.position),
+                             ('move_to', lambda: backend.move_to(x, y))):
+            start = time.perf_counter()
+            for _ in range(calls):
+                call()
+            elapsed = time.perf_counter() - start
+            print(f"{name:<10} {method:<9} {elapsed / calls * 1e6:9.1f} us/call")
+        backend.set_failsafe(True)
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Local band power from buffered eeg
+==================================
+The Cortex `pow` stream only updates a few times per second. This engine
+computes theta / alpha / betaL / betaH / gamma power for every eeg channel
+locally, from the blocks of a `StreamPipeline`, using Welch's method
+(Hann-windowed, 50 % overlapping segments) over a sliding window. All hops
+that fall inside one block are computed in a single vectorized FFT.
+
+Results are emitted on the Cortex dispatcher as `new_local_pow_data` with a
+`PowFrame`, in the same channel-major layout as the `pow` stream:
+
+    pipeline = StreamPipeline(live.c, subscriptions=live.subscriptions)
+    engine = LocalBandPower(live.c, pipeline, hop_seconds=0.0625)
+    live.c.bind(new_local_pow_data=live.on_new_pow_data)
+
+Run this file directly to check that all channels keep up in real time.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from frames import PowFrame
+from pipeline import RingBuffer
+
+# Band edges in Hz, named like the Cortex pow stream labels
+BANDS = (
+    ('theta', 4.0, 8.0),
+    ('alpha', 8.0, 12.0),
+    ('betaL', 12.0, 16.0),
+    ('betaH', 16.0, 25.0),
+    ('gamma', 25.0, 45.0),
+)
+
+WINDOW_SECONDS = 2.0     # analysis window
+SEGMENT_SECONDS = 1.0    # Welch segment length
+HOP_SECONDS = 0.125      # update interval (the pow stream runs at 8 Hz)
+
+# eeg stream columns that are not electrodes
+NON_EEG_COLUMNS = ('COUNTER', 'INTERPOLATED', 'RAW_CQ', 'MARKER_HARDWARE', 'MARKERS')
+
+
+class WelchBandPower:
+    """Vectorized Welch band power for arrays of shape (..., window)."""
+
+    def __init__(self, sample_rate, window_seconds=WINDOW_SECONDS,
+                 segment_seconds=SEGMENT_SECONDS, bands=BANDS):
+        self.sample_rate = sample_rate
+        self.window = int(round(window_seconds * sample_rate))
+        self.segment = int(round(segment_seconds * sample_rate))
+        if self.segment > self.window:
+            raise ValueError('segment_seconds must not exceed window_seconds')
+        self.step = max(1, self.segment // 2)
+        self.bands = tuple(name for name, _, _ in bands)
+
+        # periodic Hann window, as used for spectral estimation
+        self.taper = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(self.segment) / self.segment)
+        freqs = np.fft.rfftfreq(self.segment, 1.0 / sample_rate)
+        df = freqs[1] - freqs[0]
+        # One-sided PSD scaling (density, like scipy.signal.welch)
+        scale = 2.0 / (sample_rate * np.sum(self.taper ** 2))
+        self.scale = np.full(freqs.shape, scale)
+        self.scale[0] /= 2
+        if self.segment % 2 == 0:
+            self.scale[-1] /= 2
+
+        # (bins x bands) matrix integrating the PSD over each band
+        self.band_matrix = np.zeros((freqs.size, len(bands)))
+        for i, (_, low, high) in enumerate(bands):
+            self.band_matrix[(freqs >= low) & (freqs < high), i] = df
+
+    def __call__(self, windows):
+        """Band power of shape (..., bands) for `windows` of shape (..., window)."""
+        segments = sliding_window_view(windows, self.segment, axis=-1)[..., ::self.step, :]
+        segments = segments - segments.mean(axis=-1, keepdims=True)
+        spectrum = np.fft.rfft(segments * self.taper, axis=-1)
+        psd = (spectrum.real ** 2 + spectrum.imag ** 2).mean(axis=-2) * self.scale
+        return psd @ self.band_matrix
+
+
+class LocalBandPower:
+    """Sliding-window band power per channel, emitted every `hop_seconds`."""
+
+    def __init__(self, cortex, pipeline, window_seconds=WINDOW_SECONDS,
+                 hop_seconds=HOP_SECONDS, segment_seconds=SEGMENT_SECONDS,
+                 bands=BANDS, channels=None):
+        self.c = cortex
+        self.welch = WelchBandPower(pipeline.sample_rate, window_seconds, segment_seconds, bands)
+        self.window = self.welch.window
+        self.hop = max(1, int(round(hop_seconds * pipeline.sample_rate)))
+        self.capacity = self.window + pipeline.block_size
+
+        self.channels = list(channels) if channels is not None else None
+        self.index = None
+        self.labels = None      # "<channel>/<band>" like the pow stream
+        self.ring = None
+        self._since_hop = 0
+
+        self.consumer = pipeline.add_consumer(self.on_block)
+
+    def _select_channels(self, labels):
+        if self.channels is None:
+            names = [label for label in labels if label not in NON_EEG_COLUMNS]
+        else:
+            names = [label for label in self.channels if label in labels]
+        self.index = np.array([labels.index(name) for name in names], dtype=np.intp)
+        self.labels = [f'{name}/{band}' for name in names for band in self.welch.bands]
+        self.ring = RingBuffer(len(names), self.capacity)
+
+    def on_block(self, *args, **kwargs):
+        block = kwargs.get('data')
+        times = kwargs.get('time')
+        if self.index is None:
+            self._select_channels(kwargs.get('labels'))
+        block = block[self.index]
+
+        n = block.shape[1]
+        available = self.ring.total
+        self.ring.extend(block)
+
+        # 1-based offsets inside this block where a hop ends and a full window exists
+        ends = np.arange(self.hop - self._since_hop, n + 1, self.hop)
+        self._since_hop = (self._since_hop + n) % self.hop
+        ends = ends[available + ends >= self.window]
+        if ends.size == 0:
+            return
+
+        recent = self.ring.latest(self.window + n - ends[0])
+        windows = sliding_window_view(recent, self.window, axis=1)[:, ends - ends[0]]
+        powers = self.welch(windows.transpose(1, 0, 2))     # (hops, channels, bands)
+
+        for end, power in zip(ends, powers):
+            self.c.emit('new_local_pow_data', data=PowFrame(power.ravel().tolist(), times[end - 1]))
+
+
+# -----------------------------
+# Benchmark
+# -----------------------------
+def benchmark(seconds=30, sample_rate=256, hop_seconds=1 / 32):
+    """Process `seconds` of synthetic eeg and report the real-time factor."""
+    import time
+    from pydispatch import Dispatcher
+    from pipeline import StreamPipeline
+
+    class FakeCortex(Dispatcher):
+        _events_ = ['new_data_labels', 'new_eeg_data', 'new_local_pow_data']
+
+    rng = np.random.default_rng(0)
+    for channels in (14, 32):
+        fake = FakeCortex()
+        pipeline = StreamPipeline(fake, sample_rate=sample_rate)
+        engine = LocalBandPower(fake, pipeline, hop_seconds=hop_seconds)
+        labels = [f'CH{i}' for i in range(channels)]
+        fake.emit('new_data_labels', data={'streamName': 'eeg', 'labels': labels})
+
+        count = [0]
+
+        def on_pow(*args, **kwargs):
+            count[0] += 1
+
+        fake.bind(new_local_pow_data=on_pow)
+
+        n_samples = seconds * sample_rate
+        data = rng.standard_normal((channels, n_samples))
+        times = np.arange(n_samples) / sample_rate
+        consumer = engine.consumer
+        start = time.perf_counter()
+        for i in range(0, n_samples, pipeline.block_size):
+            consumer.feed(data[:, i:i + pipeline.block_size], times[i:i + pipeline.block_size])
+        elapsed = time.perf_counter() - start
+
+        print(f'{channels:>2} channels @ {sample_rate} Hz, hop {hop_seconds * 1e3:.1f} ms: '
+              f'{count[0]} updates in {elapsed * 1e3:.1f} ms for {seconds} s of data '
+              f'-> {seconds / elapsed:.0f}x real time')
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -7,84 +7,78 @@ Press ESC to interrupt the movement at any time.
 
 Features:
 - Circular movement centered on current cursor position
-- 5-second duration with smooth 30 FPS animation
+- 5-second duration with smooth 60 FPS animation, eased in and out
+- Whole path precomputed and played against absolute frame deadlines
 - Escape key interrupt capability
 - Safety fail-safe mechanisms
 - Automatic cursor position restoration
 """
 
-import pyautogui
-import time
-import threading
 import sys
 
-# Configuration constants
-DURATION = 0.01 # Animation duration in seconds
-PIXELS_PER_MOVE = 10
-
-# Global flag for interrupt handling
-interrupted = False
-
-
-def monitor_escape_key():
-    """Monitor for escape key press in a separate thread."""
-    global interrupted
-    try:
-        import keyboard
-        print("Press ESC to interrupt the movement at any time...")
-        keyboard.wait('esc')
-        interrupted = True
-        print("\nEscape key detected! Stopping movement...")
-    except ImportError:
-        print("Note: 'keyboard' library not available. Use Ctrl+C to interrupt.")
-    except Exception as e:
-        print(f"Keyboard monitoring error: {e}")
-
-
+from backends import get_backend
+from stop_signal import stop_signal
+from patterns import PATTERNS, path as pattern_path
+from trajectory import play
 
-def mouse_move():
-    """Main animation loop for circular mouse movement."""
-    global interrupted
+# Configuration constants
+RADIUS = 100        # Circle radius in pixels
+DURATION = 5.0      # Animation duration in seconds
+FPS = 60            # Frames per second (smoothness)
+ROTATIONS = 1       # Full turns over DURATION
+EASE = 0.15         # Fraction of DURATION spent speeding up / slowing down
+PATTERN = 'circle'  # or figure8, spiral, lissajous, bezier (see patterns.py)
+# Closed loop through these offsets from the start position for the bezier pattern
+BEZIER_WAYPOINTS = ((0, 0), (150, -100), (250, 50), (100, 150), (-100, 80))
+
+
+def mouse_move(cursor=None, radius=RADIUS, duration=DURATION, fps=FPS, rotations=ROTATIONS,
+               ease=EASE, pattern=PATTERN, **params):
+    """Move the cursor along a pattern (a circle by default) centered on its current position.
+
+    `params` go to the pattern generator, e.g. width/height for figure8.
+    ESC / Ctrl+C interrupt only the current run: the shared stop signal is
+    re-armed when the next run starts.
+    """
+    cursor = cursor or get_backend()
+    # ESC / Ctrl+C; installed once however often mouse_move is called
+    stop_signal.start()
+    # an earlier interrupted run left the signal raised; this is a new run
+    stop_signal.reset()
+
+    # Current cursor position is the circle center
+    original_x, original_y = cursor.position()
+    center = (original_x, original_y)
+    if pattern == 'circle':
+        params.update(radius=radius, rotations=rotations)
+    elif pattern == 'bezier':
+        params.setdefault('waypoints', BEZIER_WAYPOINTS)
+        params.setdefault('closed', True)
+    path = pattern_path(pattern, center, duration, fps, ease=ease, **params)
+
+    print(f"Starting {pattern} movement centered at {center}")
+    if pattern == 'circle':
+        print(f"Circle radius: {radius} pixels, {rotations} rotation(s)")
+    print(f"Duration: {duration} seconds at {fps} FPS")
 
     try:
-        # Disable PyAutoGUI fail-safe temporarily for smooth movement
-        pyautogui.FAILSAFE = False
-
-        # Start keyboard monitoring thread
-        keyboard_thread = threading.Thread(target=monitor_escape_key, daemon=True)
-        keyboard_thread.start()
-
-        # Main animation loop
-        while not interrupted:
-            # Get initial cursor position as circle center
-            original_x, original_y = pyautogui.position()
-
-            dx = 0
-            dy = 0
-
-            if (TODO: MOVING LEFT):
-                dx -= 1
-            if (TODO: MOVING RIGHT):
-                dx += 1
-
-            if (TODO: MOVING UP):
-                dy -= 1
-            if (TODO: MOVING DOWN):
-                dy += 1
-
-            # Calculate new position
-            x += PIXELS_PER_MOVE * dx
-            y += PIXELS_PER_MOVE * dy
-
-            # Move mouse to calculated position
-            pyautogui.moveTo(x, y, duration=0)
-
-            # Maintain frame rate
-            time.sleep(DURATION)
-
+        # Disable the corner fail-safe temporarily for smooth movement
+        cursor.set_failsafe(False)
+        stats = play(path, cursor.move_to, fps=fps, stop=stop_signal.is_stopped)
     finally:
-        # Re-enable PyAutoGUI fail-safe
-        pyautogui.FAILSAFE = True
+        print(f"Restoring cursor to original position ({original_x}, {original_y})")
+        cursor.move_to(original_x, original_y)
+        # Re-enable the corner fail-safe
+        cursor.set_failsafe(True)
+
+    if stop_signal.is_stopped():
+        print("\nMovement interrupted.")
+    else:
+        print(f"\nCompleted {duration}-second {pattern} movement!")
+    print(f"Achieved {stats['fps']:.1f} of {stats['target_fps']:.0f} FPS, "
+          f"max lateness {stats['max_late_ms']:.2f} ms, jitter {stats['jitter_ms']:.2f} ms, "
+          f"{stats['dropped']} frame(s) dropped")
+    return stats
 
 
 def check_dependencies():
@@ -116,8 +110,27 @@ def main():
     if not check_dependencies():
         sys.exit(1)
 
+    print("=" * 50)
+    print("Circular Mouse Movement Automation")
+    print("=" * 50)
+    print("\nSAFETY NOTE: This script will control your mouse cursor.")
+    print("Make sure you're ready before proceeding.")
+    print(f"The cursor will move in a circle for {DURATION:g} seconds.\n")
+    try:
+        input("Press ENTER to start the circular movement (or Ctrl+C to cancel)...")
+    except (KeyboardInterrupt, EOFError):
+        print("\nCancelled.")
+        return
+
+    # Optional pattern name, e.g. `python circular_mouse.py figure8`
+    pattern = sys.argv[1] if len(sys.argv) > 1 else PATTERN
+    if pattern not in PATTERNS:
+        print(f"Unknown pattern {pattern!r}; choose from {', '.join(PATTERNS)}")
+        sys.exit(1)
+
     # Start the animation
-    mouse_move()
+    mouse_move(pattern=pattern)
+    print("Circular movement complete!")
 
 if __name__ == "__main__":
     main()
@@ -27,6 +27,8 @@ import time
 import json
 from datetime import datetime
 
+from frames import ComFrame, FacFrame, EegFrame, MotFrame, DevFrame, MetFrame, PowFrame
+
 # define request id
 QUERY_HEADSET_ID                    =   1
 CONNECT_HEADSET_ID                  =   2
@@ -85,7 +87,8 @@ class Cortex(Dispatcher):
                 'mc_training_threshold_done', 'create_record_done', 'stop_record_done','warn_cortex_stop_all_sub', 'warn_record_post_processing_done',
                 'inject_marker_done', 'update_marker_done', 'export_record_done', 'new_data_labels', 
                 'new_com_data', 'new_fe_data', 'new_eeg_data', 'new_mot_data', 'new_dev_data', 
-                'new_met_data', 'new_pow_data', 'new_sys_data']
+                'new_met_data', 'new_pow_data', 'new_sys_data', 'sub_request_done', 'unsub_request_done',
+                'new_local_pow_data']
     def __init__(self, client_id, client_secret, debug_mode=False, **kwargs):
         
         self.session_id = ''
@@ -94,6 +97,7 @@ class Cortex(Dispatcher):
         self.debit = 10
         self.license = ''
         self.isHeadsetConnected = False
+        self.data_labels = {}   # stream name -> labels from the latest subscribe response
 
         if client_id == '':
             raise ValueError('Empty your_app_client_id. Please fill in your_app_client_id before running the example.')
@@ -240,6 +244,8 @@ class Cortex(Dispatcher):
                 stream_name = stream['streamName']
                 stream_msg = stream['message']
                 print('The data stream '+ stream_name + ' is subscribed unsuccessfully. Because: ' + stream_msg)
+
+            self.emit('sub_request_done', data=result_dic)
         elif req_id == UNSUB_REQUEST_ID:
             for stream in result_dic['success']:
                 stream_name = stream['streamName']
@@ -250,6 +256,8 @@ class Cortex(Dispatcher):
                 stream_msg = stream['message']
                 print('The data stream '+ stream_name + ' is unsubscribed unsuccessfully. Because: ' + stream_msg)
 
+            self.emit('unsub_request_done', data=result_dic)
+
         elif req_id == QUERY_PROFILE_ID:
             profile_list = []
             for ele in result_dic:
@@ -312,6 +320,7 @@ class Cortex(Dispatcher):
         elif req_id == EXPORT_RECORD_ID:
             # handle data lable
             success_export = []
+            failure_export = []
             for record in result_dic['success']:
                 record_id = record['recordId']
                 success_export.append(record_id)
@@ -320,8 +329,9 @@ class Cortex(Dispatcher):
                 record_id = record['recordId']
                 failure_msg = record['message']
                 print('export_record resp failure cases: '+ record_id + ":" + failure_msg)
+                failure_export.append(record)
 
-            self.emit('export_record_done', data=success_export)
+            self.emit('export_record_done', data=success_export, failure=failure_export)
         elif req_id == INJECT_MARKER_REQUEST_ID:
             self.emit('inject_marker_done', data=result_dic['marker'])
         elif req_id == UPDATE_MARKER_REQUEST_ID:
@@ -332,7 +342,7 @@ class Cortex(Dispatcher):
     def handle_error(self, recv_dic):
         req_id = recv_dic['id']
         print('handle_error: request Id ' + str(req_id))
-        self.emit('inform_error', error_data=recv_dic['error'])
+        self.emit('inform_error', error_data=recv_dic['error'], request_id=req_id)
     
     def handle_warning(self, warning_dic):
 
@@ -365,48 +375,26 @@ class Cortex(Dispatcher):
 
     def handle_stream_data(self, result_dic):
         if result_dic.get('com') != None:
-            com_data = {}
-            com_data['action'] = result_dic['com'][0]
-            com_data['power'] = result_dic['com'][1]
-            com_data['time'] = result_dic['time']
-            self.emit('new_com_data', data=com_data)
+            com = result_dic['com']
+            self.emit('new_com_data', data=ComFrame(com[0], com[1], result_dic['time']))
         elif result_dic.get('fac') != None:
-            fe_data = {}
-            fe_data['eyeAct'] = result_dic['fac'][0]    #eye action
-            fe_data['uAct'] = result_dic['fac'][1]      #upper action
-            fe_data['uPow'] = result_dic['fac'][2]      #upper action power
-            fe_data['lAct'] = result_dic['fac'][3]      #lower action
-            fe_data['lPow'] = result_dic['fac'][4]      #lower action power
-            fe_data['time'] = result_dic['time']
+            fac = result_dic['fac']
+            # eye action, upper action, upper action power, lower action, lower action power
+            fe_data = FacFrame(fac[0], fac[1], fac[2], fac[3], fac[4], result_dic['time'])
             self.emit('new_fe_data', data=fe_data)
         elif result_dic.get('eeg') != None:
-            eeg_data = {}
-            eeg_data['eeg'] = result_dic['eeg']
-            eeg_data['eeg'].pop() # remove markers
-            eeg_data['time'] = result_dic['time']
-            self.emit('new_eeg_data', data=eeg_data)
+            eeg = result_dic['eeg']
+            eeg.pop() # remove markers
+            self.emit('new_eeg_data', data=EegFrame(eeg, result_dic['time']))
         elif result_dic.get('mot') != None:
-            mot_data = {}
-            mot_data['mot'] = result_dic['mot']
-            mot_data['time'] = result_dic['time']
-            self.emit('new_mot_data', data=mot_data)
+            self.emit('new_mot_data', data=MotFrame(result_dic['mot'], result_dic['time']))
         elif result_dic.get('dev') != None:
-            dev_data = {}
-            dev_data['signal'] = result_dic['dev'][1]
-            dev_data['dev'] = result_dic['dev'][2]
-            dev_data['batteryPercent'] = result_dic['dev'][3]
-            dev_data['time'] = result_dic['time']
-            self.emit('new_dev_data', data=dev_data)
+            dev = result_dic['dev']
+            self.emit('new_dev_data', data=DevFrame(dev[1], dev[2], dev[3], result_dic['time']))
         elif result_dic.get('met') != None:
-            met_data = {}
-            met_data['met'] = result_dic['met']
-            met_data['time'] = result_dic['time']
-            self.emit('new_met_data', data=met_data)
+            self.emit('new_met_data', data=MetFrame(result_dic['met'], result_dic['time']))
         elif result_dic.get('pow') != None:
-            pow_data = {}
-            pow_data['pow'] = result_dic['pow']
-            pow_data['time'] = result_dic['time']
-            self.emit('new_pow_data', data=pow_data)
+            self.emit('new_pow_data', data=PowFrame(result_dic['pow'], result_dic['time']))
         elif result_dic.get('sys') != None:
             sys_data = result_dic['sys']
             self.emit('new_sys_data', data=sys_data)
@@ -628,6 +616,7 @@ class Cortex(Dispatcher):
             data_labels = stream_cols
 
         labels['labels'] = data_labels
+        self.data_labels[stream_name] = data_labels
         print(labels)
         self.emit('new_data_labels', data=labels)
 
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Locally tracked cursor position
+===============================
+`CursorState` wraps a cursor backend and remembers where it last put the
+cursor, so position reads are served from memory instead of a round trip to
+the display server. It only re-reads the real position when told that the
+cursor moved externally (`on_external_move`, normally called by a user-input
+monitor) or, optionally, when the cached value is older than `max_age`.
+
+Targets are clamped to the monitor layout from `ScreenGeometry` in memory
+(or wrapped around the desktop edges with `edge='wrap'`). When the layout is
+unknown, targets are passed through and the OS keeps the cursor on screen.
+
+It implements the same interface as the backends, so it can be passed
+anywhere a backend is expected:
+
+    cursor = CursorState(get_backend())
+    cursor.move_rel(5, 0)
+    x, y = cursor.position()      # no display round trip
+"""
+
+import threading
+import time
+from collections import deque
+
+from backends import CursorBackend
+from screen import ScreenGeometry
+
+# How long a position we set is remembered for recognising our own pointer events
+SYNTHETIC_WINDOW = 0.5
+
+
+class CursorState(CursorBackend):
+    """Cursor backend wrapper that caches the position we set."""
+
+    def __init__(self, backend, max_age=None, screen=None, edge='clamp'):
+        if edge not in ('clamp', 'wrap'):
+            raise ValueError(f"edge must be 'clamp' or 'wrap', not {edge!r}")
+        self.backend = backend
+        self.name = 'cached-' + backend.name
+        self.max_age = max_age      # seconds; None = trust the cache until told otherwise
+        self._lock = threading.Lock()
+
+        self.screen = screen or ScreenGeometry(backend)
+        self._fit = self.screen.wrap if edge == 'wrap' else self.screen.clamp
+        self._pos = backend.position()
+        self.synced_at = time.monotonic()
+        self.resyncs = 0
+        self.cached_reads = 0
+        self._recent = deque(maxlen=64)     # (x, y, monotonic time) of our own moves
+        self.last_click = 0.0
+
+    # ---- Reads ----
+    def position(self):
+        if self.max_age is not None and time.monotonic() - self.synced_at > self.max_age:
+            return self.resync()
+        self.cached_reads += 1
+        return self._pos
+
+    def real_position(self):
+        """Position read from the OS, past the cache and any output stage."""
+        return self.backend.real_position()
+
+    def size(self):
+        return self.screen.size()
+
+    def speed_scale(self):
+        """Speed scale of the monitor the cursor is on."""
+        return self.screen.scale_at(*self._pos)
+
+    def resync(self):
+        """Read the real position from the backend."""
+        with self._lock:
+            self._pos = self.backend.position()
+            self.synced_at = time.monotonic()
+            self.resyncs += 1
+            return self._pos
+
+    def on_external_move(self, x=None, y=None):
+        """Something other than us moved the cursor; adopt (x, y) or re-read it."""
+        if x is None or y is None:
+            return self.resync()
+        with self._lock:
+            self._pos = (x, y)
+            self.synced_at = time.monotonic()
+            return self._pos
+
+    def is_ours(self, x, y):
+        """True if (x, y) is where we last put the cursor."""
+        return (x, y) == self._pos
+
+    def was_ours(self, x, y, window=SYNTHETIC_WINDOW):
+        """True if we moved the cursor to (x, y) within the last `window` seconds.
+
+        Pointer events can arrive after later moves were issued, so recent
+        targets are checked, not just the current one.
+        """
+        if (x, y) == self._pos:
+            return True
+        oldest = time.monotonic() - window
+        for rx, ry, at in reversed(self._recent):
+            if at < oldest:
+                break
+            if rx == x and ry == y:
+                return True
+        return False
+
+    # ---- Writes ----
+    def move_to(self, x, y):
+        with self._lock:
+            self._pos = self._fit(x, y)
+            self._recent.append(self._pos + (time.monotonic(),))
+            self.backend.move_to(*self._pos)
+
+    def move_rel(self, dx, dy):
+        with self._lock:
+            x, y = self._pos
+            self._pos = self._fit(x + dx, y + dy)
+            self._recent.append(self._pos + (time.monotonic(),))
+            self.backend.move_to(*self._pos)
+
+    def click(self, button='left'):
+        self.last_click = time.monotonic()
+        self.backend.click(button)
+
+    def press(self, key):
+        self.backend.press(key)
+
+    def set_failsafe(self, enabled):
+        self.backend.set_failsafe(enabled)
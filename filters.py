@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Streaming IIR filter bank
+=========================
+Second-order-section (SOS) Butterworth band-pass and notch filters for eeg
+blocks of shape (channels, samples). Filter state is kept between calls, so
+consecutive blocks from a `StreamPipeline` are filtered as one continuous
+signal.
+
+`FilterBank` applies an optional common notch (mains hum) and then several
+band-pass filters in parallel, returning an array of shape
+(bands, channels, samples):
+
+    bank = FilterBank(channels=14, sample_rate=128, notch=50,
+                      bands={'alpha': (8, 12), 'beta': (12, 25)})
+    pipeline.add_consumer(bank.consumer(on_filtered))
+
+SciPy's `sosfilt` is used when it is installed; otherwise a NumPy
+implementation runs the recursion once per sample, vectorized over all
+bands and channels.
+
+Run this file directly for throughput numbers at 14 and 32 channels.
+"""
+
+import cmath
+import math
+
+import numpy as np
+
+try:
+    from scipy.signal import sosfilt
+except ImportError:
+    sosfilt = None
+
+FILTER_ORDER = 4         # Butterworth order of each band edge
+NOTCH_Q = 30.0           # quality factor of the mains notch
+
+DEFAULT_BANDS = {
+    'theta': (4.0, 8.0),
+    'alpha': (8.0, 12.0),
+    'betaL': (12.0, 16.0),
+    'betaH': (16.0, 25.0),
+    'gamma': (25.0, 45.0),
+}
+
+
+# -----------------------------
+# Filter design
+# -----------------------------
+def butter_sos(order, cutoff, sample_rate, btype='lowpass'):
+    """Butterworth low/high-pass as SOS rows [b0, b1, b2, 1, a1, a2]."""
+    if btype not in ('lowpass', 'highpass'):
+        raise ValueError(f"btype must be 'lowpass' or 'highpass', not {btype!r}")
+    if not 0 < cutoff < sample_rate / 2:
+        raise ValueError(f'cutoff {cutoff} Hz must be between 0 and Nyquist ({sample_rate / 2} Hz)')
+
+    k = math.tan(math.pi * cutoff / sample_rate)    # pre-warped frequency
+    sections = []
+    for i in range(order // 2):
+        # upper-half-plane analog pole of the normalised Butterworth prototype
+        pole = cmath.exp(1j * math.pi * (2 * i + order + 1) / (2 * order))
+        q = -1.0 / (2.0 * pole.real)
+        norm = 1.0 / (1.0 + k / q + k * k)
+        a1 = 2.0 * (k * k - 1.0) * norm
+        a2 = (1.0 - k / q + k * k) * norm
+        if btype == 'lowpass':
+            b0 = k * k * norm
+            sections.append([b0, 2 * b0, b0, 1.0, a1, a2])
+        else:
+            sections.append([norm, -2 * norm, norm, 1.0, a1, a2])
+    if order % 2:
+        norm = 1.0 / (1.0 + k)
+        a1 = (k - 1.0) * norm
+        if btype == 'lowpass':
+            sections.append([k * norm, k * norm, 0.0, 1.0, a1, 0.0])
+        else:
+            sections.append([norm, -norm, 0.0, 1.0, a1, 0.0])
+    return np.array(sections)
+
+
+def bandpass_sos(low, high, sample_rate, order=FILTER_ORDER):
+    """Band-pass built from a high-pass at `low` and a low-pass at `high`."""
+    if not low < high:
+        raise ValueError(f'low ({low} Hz) must be below high ({high} Hz)')
+    return np.vstack((butter_sos(order, low, sample_rate, 'highpass'),
+                      butter_sos(order, high, sample_rate, 'lowpass')))
+
+
+def notch_sos(frequency, sample_rate, q=NOTCH_Q):
+    """Single-section notch (RBJ biquad) at `frequency`."""
+    w0 = 2 * math.pi * frequency / sample_rate
+    alpha = math.sin(w0) / (2 * q)
+    a0 = 1 + alpha
+    cos_w0 = math.cos(w0)
+    return np.array([[1 / a0, -2 * cos_w0 / a0, 1 / a0, 1.0, -2 * cos_w0 / a0, (1 - alpha) / a0]])
+
+
+# -----------------------------
+# Filtering
+# -----------------------------
+def _sosfilt_numpy(sos, x, zi):
+    """Transposed direct form II over the last axis of `x`, state updated in place.
+
+    `sos` has shape (sections, 6, *rows) so every row of `x` may have its own
+    coefficients; `zi` has shape (sections, *x.shape[:-1], 2).
+    """
+    y = np.empty_like(x)
+    n_sections = sos.shape[0]
+    coeffs = [tuple(sos[s, i] for i in (0, 1, 2, 4, 5)) for s in range(n_sections)]
+    for t in range(x.shape[-1]):
+        value = x[..., t]
+        for s in range(n_sections):
+            b0, b1, b2, a1, a2 = coeffs[s]
+            z = zi[s]
+            out = b0 * value + z[..., 0]
+            z[..., 0] = b1 * value - a1 * out + z[..., 1]
+            z[..., 1] = b2 * value - a2 * out
+            value = out
+        y[..., t] = value
+    return y
+
+
+class SosFilter:
+    """One SOS cascade applied to (channels, samples) blocks, keeping state."""
+
+    def __init__(self, sos, channels):
+        self.sos = np.asarray(sos, dtype=np.float64)
+        self.zi = np.zeros((self.sos.shape[0], channels, 2))
+
+    def reset(self):
+        self.zi[:] = 0.0
+
+    def __call__(self, block):
+        block = np.asarray(block, dtype=np.float64)
+        if sosfilt is not None:
+            out, self.zi = sosfilt(self.sos, block, axis=-1, zi=self.zi)
+            return out
+        return _sosfilt_numpy(self.sos[:, :, None], block, self.zi)
+
+
+class FilterBank:
+    """Common notch followed by several band-pass filters run in parallel."""
+
+    def __init__(self, channels, sample_rate, bands=None, notch=None,
+                 order=FILTER_ORDER, notch_q=NOTCH_Q):
+        bands = DEFAULT_BANDS if bands is None else bands
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.band_names = list(bands)
+
+        notches = [] if notch is None else ([notch] if np.isscalar(notch) else list(notch))
+        self.notch = None
+        if notches:
+            self.notch = SosFilter(np.vstack([notch_sos(f, sample_rate, notch_q) for f in notches]), channels)
+
+        # (bands, sections, 6); every band has the same number of sections
+        self.sos = np.stack([bandpass_sos(low, high, sample_rate, order) for low, high in bands.values()])
+        self.zi = np.zeros((self.sos.shape[1], len(self.band_names), channels, 2))
+        # numpy fallback: coefficients laid out as (sections, 6, bands, 1)
+        self._stacked = self.sos.transpose(1, 2, 0)[..., None]
+
+    def reset(self):
+        self.zi[:] = 0.0
+        if self.notch is not None:
+            self.notch.reset()
+
+    def __call__(self, block):
+        """Filter a (channels, samples) block into (bands, channels, samples)."""
+        block = np.asarray(block, dtype=np.float64)
+        if self.notch is not None:
+            block = self.notch(block)
+
+        if sosfilt is not None:
+            out = np.empty((len(self.band_names),) + block.shape)
+            for i in range(len(self.band_names)):
+                out[i], self.zi[:, i] = sosfilt(self.sos[i], block, axis=-1, zi=self.zi[:, i])
+            return out
+
+        stacked = np.broadcast_to(block, (len(self.band_names),) + block.shape)
+        return _sosfilt_numpy(self._stacked, stacked, self.zi)
+
+    def consumer(self, callback):
+        """Wrap `callback` as a `StreamPipeline` consumer receiving filtered blocks."""
+        def on_block(*args, **kwargs):
+            filtered = self(kwargs.get('data'))
+            callback(data=filtered, time=kwargs.get('time'), labels=kwargs.get('labels'),
+                     bands=self.band_names)
+        return on_block
+
+
+# -----------------------------
+# Benchmark
+# -----------------------------
+def benchmark(seconds=20, sample_rate=256, block_size=32):
+    """Throughput of the filter bank in samples/sec for 14 and 32 channels."""
+    import time
+    global sosfilt
+
+    backends = [('numpy', None)]
+    if sosfilt is not None:
+        backends.insert(0, ('scipy', sosfilt))
+    saved = sosfilt
+
+    rng = np.random.default_rng(0)
+    n_samples = seconds * sample_rate
+    try:
+        for name, backend in backends:
+            sosfilt = backend
+            for channels in (14, 32):
+                bank = FilterBank(channels, sample_rate, notch=50)
+                data = rng.standard_normal((channels, n_samples))
+                start = time.perf_counter()
+                for i in range(0, n_samples, block_size):
+                    bank(data[:, i:i + block_size])
+                elapsed = time.perf_counter() - start
+                print(f'{name:<6}{channels:>3} ch, {len(bank.band_names)} bands + notch: '
+                      f'{n_samples / elapsed:>12,.0f} samples/s '
+                      f'({n_samples * channels / elapsed:>14,.0f} channel-samples/s, '
+                      f'{seconds / elapsed:,.0f}x real time)')
+    finally:
+        sosfilt = saved
+
+
+if __name__ == "__main__":
+    benchmark()
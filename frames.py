@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Compact stream frame types
+==========================
+Typed, slotted replacements for the per-frame dicts built in
+`Cortex.handle_stream_data` and `PowerMonitor.add_reading`.
+
+Every frame class keeps its values in `__slots__` (no per-instance `__dict__`)
+and also implements the read-only mapping interface, so existing handlers that
+do `data.get('power', 0.0)` or `data['met']` keep working unchanged.
+
+Run this file directly to benchmark memory per retained frame and build rate
+against the old dict frames:
+
+    python frames.py
+"""
+
+from collections.abc import Mapping
+
+
+class Frame(Mapping):
+    """Base class: slotted storage with a dict-like read interface."""
+
+    __slots__ = ()
+    _fields = ()
+
+    def __getitem__(self, key):
+        if key in self._fields:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __repr__(self):
+        values = ', '.join(f'{name}={getattr(self, name)!r}' for name in self._fields)
+        return f'{type(self).__name__}({values})'
+
+    def to_dict(self):
+        """Return a plain dict copy (e.g. for JSON serialisation)."""
+        return {name: getattr(self, name) for name in self._fields}
+
+
+class ComFrame(Frame):
+    """Mental command frame: the detected action and its power."""
+
+    __slots__ = _fields = ('action', 'power', 'time')
+
+    def __init__(self, action, power, time):
+        self.action = action
+        self.power = power
+        self.time = time
+
+
+class FacFrame(Frame):
+    """Facial expression frame."""
+
+    __slots__ = _fields = ('eyeAct', 'uAct', 'uPow', 'lAct', 'lPow', 'time')
+
+    def __init__(self, eyeAct, uAct, uPow, lAct, lPow, time):
+        self.eyeAct = eyeAct    # eye action
+        self.uAct = uAct        # upper action
+        self.uPow = uPow        # upper action power
+        self.lAct = lAct        # lower action
+        self.lPow = lPow        # lower action power
+        self.time = time
+
+
+class EegFrame(Frame):
+    """Raw eeg sample (markers column already removed)."""
+
+    __slots__ = _fields = ('eeg', 'time')
+
+    def __init__(self, eeg, time):
+        self.eeg = eeg
+        self.time = time
+
+
+class MotFrame(Frame):
+    """Motion sensor sample."""
+
+    __slots__ = _fields = ('mot', 'time')
+
+    def __init__(self, mot, time):
+        self.mot = mot
+        self.time = time
+
+
+class DevFrame(Frame):
+    """Device information: signal strength, contact quality and battery."""
+
+    __slots__ = _fields = ('signal', 'dev', 'batteryPercent', 'time')
+
+    def __init__(self, signal, dev, batteryPercent, time):
+        self.signal = signal
+        self.dev = dev
+        self.batteryPercent = batteryPercent
+        self.time = time
+
+
+class MetFrame(Frame):
+    """Performance metrics sample."""
+
+    __slots__ = _fields = ('met', 'time')
+
+    def __init__(self, met, time):
+        self.met = met
+        self.time = time
+
+
+class PowFrame(Frame):
+    """Band power sample, flattened as channel/band pairs."""
+
+    __slots__ = _fields = ('pow', 'time')
+
+    def __init__(self, pow, time):
+        self.pow = pow
+        self.time = time
+
+
+class PowerReading(Frame):
+    """One mental-command power reading."""
+
+    __slots__ = _fields = ('power', 'action', 'timestamp')
+
+    def __init__(self, power, action, timestamp):
+        self.power = power
+        self.action = action
+        self.timestamp = timestamp
+
+
+# -----------------------------
+# Benchmark
+# -----------------------------
+def _build_dict_frames(count):
+    frames = []
+    for i in range(count):
+        com_data = {}
+        com_data['action'] = 'push'
+        com_data['power'] = i * 1e-6
+        com_data['time'] = 1700000000.0 + i
+        frames.append(com_data)
+    return frames
+
+
+def _build_slotted_frames(count):
+    frames = []
+    for i in range(count):
+        frames.append(ComFrame('push', i * 1e-6, 1700000000.0 + i))
+    return frames
+
+
+def benchmark(count=200000):
+    """Compare bytes per retained frame and frames/sec built."""
+    import time
+    import tracemalloc
+
+    results = {}
+    for name, build in (('dict', _build_dict_frames), ('slots', _build_slotted_frames)):
+        # Throughput (without tracemalloc overhead)
+        start = time.perf_counter()
+        build(count)
+        elapsed = time.perf_counter() - start
+
+        # Retained memory, excluding the shared float/str payloads as far as possible
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        frames = build(count)
+        after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del frames
+
+        results[name] = {
+            'bytes_per_frame': (after - before) / count,
+            'frames_per_sec': count / elapsed,
+        }
+
+    print(f"{'type':<8}{'bytes/frame':>14}{'frames/sec':>16}")
+    for name, res in results.items():
+        print(f"{name:<8}{res['bytes_per_frame']:>14.1f}{res['frames_per_sec']:>16,.0f}")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark()
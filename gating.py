@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Action gating
+=============
+One noisy `com` frame above threshold should not move the cursor or click.
+`ActionGate` sits between the threshold check and the effects and only lets
+an action through once it wins a vote over the last `window` frames:
+
+- every action has a fixed-size ring of votes (an `array`), updated in place
+  with a running sum, so a frame costs O(actions) with no allocation;
+- votes are either one per frame (`mode='majority'`) or scaled by power
+  (`mode='weighted'`: a frame at `full_vote` power or more is a full vote);
+- hysteresis: an action becomes active when its vote share reaches `enter`
+  and stays active until the share drops below `exit`, so a held command
+  does not flicker on and off;
+- edges are reported once, as `enter` and `exit` events, together with the
+  latency the gate added.
+
+    gate = ActionGate()
+    gate.on_event(lambda event: print(event))
+    binding = actions.lookup(action, power)
+    if gate.update(action if binding else None, power):
+        ...                            # gate.active just entered: click once
+    if gate.active:
+        ...                            # held: keep moving at gate.power
+
+With the defaults (3 of the last 5 frames to enter) an action is accepted
+two com frames (0.25 s at 8 Hz) after it first appears; `stats()` reports
+the latency actually added.
+"""
+
+import math
+import time
+from array import array
+from collections import deque
+
+from frames import Frame
+
+GATE_WINDOW = 5          # com frames per vote window (0.625 s at 8 Hz)
+ENTER_SHARE = 0.6        # vote share that activates an action (3 of 5)
+EXIT_SHARE = 0.4         # an active action is released below this share
+FULL_VOTE_POWER = 0.75   # weighted mode: power at which a frame is a full vote
+STATS_WINDOW = 256       # events kept for latency statistics
+
+
+class GateEvent(Frame):
+    """An action entering or leaving the active state."""
+
+    __slots__ = _fields = ('kind', 'action', 'power', 'latency', 'time')
+
+    def __init__(self, kind, action, power, latency, time):
+        self.kind = kind
+        self.action = action
+        self.power = power
+        self.latency = latency
+        self.time = time
+
+
+class ActionGate:
+    """Sliding-window vote with enter/exit hysteresis over com actions."""
+
+    def __init__(self, window=GATE_WINDOW, enter=ENTER_SHARE, exit=EXIT_SHARE, mode='majority',
+                 full_vote=FULL_VOTE_POWER, ignore=('neutral',)):
+        if window < 1:
+            raise ValueError(f'window must be at least 1 frame, not {window}')
+        if not 0.0 <= exit < enter <= 1.0:
+            raise ValueError(f'need 0 <= exit < enter <= 1, got exit={exit}, enter={enter}')
+        if mode not in ('majority', 'weighted'):
+            raise ValueError(f"mode must be 'majority' or 'weighted', not {mode!r}")
+        self.window = window
+        self.enter = enter
+        self.exit = exit
+        self.mode = mode
+        self.full_vote = full_vote
+        self.ignore = frozenset(ignore)
+
+        self._votes = {}       # action -> array('d') ring of votes
+        self._powers = {}      # action -> array('d') ring of powers
+        self._vote_sum = {}
+        self._power_sum = {}
+        self._times = array('d', bytes(8 * window))   # frame times, same ring slots
+        self._last_seen = {}   # action -> time of its latest frame
+        self._slot = 0
+        self._callbacks = []
+
+        self.active = None     # currently accepted action
+        self.power = 0.0       # mean power of the active action's frames in the window
+
+        self.frames = 0
+        self.raw_onsets = 0    # changes to a new action an ungated handler would act on
+        self.enters = 0
+        self.exits = 0
+        self._previous = None
+        self.enter_latency = deque(maxlen=STATS_WINDOW)
+        self.exit_latency = deque(maxlen=STATS_WINDOW)
+
+    # ---- Events ----
+    def on_event(self, callback):
+        """Call `callback(GateEvent)` on every enter and exit."""
+        self._callbacks.append(callback)
+        return callback
+
+    def _emit(self, kind, action, power, latency, now):
+        if kind == 'enter':
+            self.enters += 1
+            self.enter_latency.append(latency)
+        else:
+            self.exits += 1
+            self.exit_latency.append(latency)
+        if self._callbacks:
+            event = GateEvent(kind, action, power, latency, now)
+            for callback in self._callbacks:
+                callback(event)
+
+    # ---- Voting ----
+    def _ring(self, action):
+        self._votes[action] = array('d', bytes(8 * self.window))
+        self._powers[action] = array('d', bytes(8 * self.window))
+        self._vote_sum[action] = 0.0
+        self._power_sum[action] = 0.0
+
+    def score(self, action):
+        """Vote share of `action` over the window (0..1)."""
+        return self._vote_sum.get(action, 0.0) / self.window
+
+    def update(self, action, power, now=None):
+        """Add one frame; True if an action became active on this frame.
+
+        `action` is None (or an ignored action) for frames that should not
+        vote, e.g. frames below threshold.
+        """
+        now = time.monotonic() if now is None else now
+        self.frames += 1
+        if action in self.ignore:
+            action = None
+        if action is not None:
+            if action not in self._votes:
+                self._ring(action)
+            if action != self._previous:
+                self.raw_onsets += 1
+        self._previous = action
+
+        if self.mode == 'majority':
+            vote = 1.0
+        else:
+            vote = min(power / self.full_vote, 1.0) if self.full_vote > 0 else 1.0
+        slot = self._slot
+        self._slot = (slot + 1) % self.window
+        self._times[slot] = now
+        for name, votes in self._votes.items():
+            powers = self._powers[name]
+            if name == action:
+                new_vote, new_power = vote, power
+                self._last_seen[name] = now
+            else:
+                new_vote = new_power = 0.0
+            self._vote_sum[name] += new_vote - votes[slot]
+            self._power_sum[name] += new_power - powers[slot]
+            votes[slot] = new_vote
+            powers[slot] = new_power
+            if self._vote_sum[name] < 1e-9:
+                # clear float drift once the action has left the window
+                self._vote_sum[name] = self._power_sum[name] = 0.0
+
+        return self._decide(now)
+
+    def _decide(self, now):
+        window = self.window
+        best, best_share = None, 0.0
+        for name, total in self._vote_sum.items():
+            share = total / window
+            if share > best_share:
+                best, best_share = name, share
+
+        active = self.active
+        if active is not None:
+            share = self._vote_sum[active] / window
+            if share >= self.exit and (best == active or best_share < self.enter):
+                self.power = self._active_power(active)
+                return False
+            # released, or another action clearly took over
+            self.active = None
+            self.power = 0.0
+            self._emit('exit', active, 0.0, now - self._last_seen.get(active, now), now)
+
+        if best is not None and best_share >= self.enter:
+            self.active = best
+            self.power = self._active_power(best)
+            self._emit('enter', best, self.power, now - self._first_vote(best), now)
+            return True
+        return False
+
+    def _first_vote(self, action):
+        """Time of the oldest frame in the window that voted for `action`."""
+        votes = self._votes[action]
+        window = self.window
+        for k in range(window):
+            slot = (self._slot + k) % window    # oldest slot first
+            if votes[slot] > 0.0:
+                return self._times[slot]
+        return self._times[(self._slot - 1) % window]
+
+    def _active_power(self, action):
+        count = 0
+        for p in self._powers[action]:
+            if p > 0.0:
+                count += 1
+        return self._power_sum[action] / count if count else 0.0
+
+    def reset(self):
+        """Forget all votes (e.g. after a manual override); exits the active action."""
+        now = time.monotonic()
+        for name in self._votes:
+            self._ring(name)
+        self._previous = None
+        if self.active is not None:
+            active, self.active, self.power = self.active, None, 0.0
+            self._emit('exit', active, 0.0, 0.0, now)
+
+    # ---- Reporting ----
+    def latency_bound(self, frame_interval):
+        """Worst-case delay (s) added to an action held from its first frame."""
+        return (math.ceil(self.enter * self.window - 1e-9) - 1) * frame_interval
+
+    def stats(self):
+        def summary(values):
+            if not values:
+                return {'mean_ms': 0.0, 'max_ms': 0.0}
+            return {'mean_ms': 1000.0 * sum(values) / len(values), 'max_ms': 1000.0 * max(values)}
+
+        return {
+            'frames': self.frames,
+            'raw_onsets': self.raw_onsets,
+            'enters': self.enters,
+            'exits': self.exits,
+            'suppressed': max(self.raw_onsets - self.enters, 0),
+            'enter_latency': summary(self.enter_latency),
+            'exit_latency': summary(self.exit_latency),
+        }
+
+
+if __name__ == "__main__":
+    # Replay a noisy synthetic session through main.py's discrete path
+    # (click on drop): count clicks and onsets with and without the gate.
+    import random
+
+    from replay import COM_RATE, synthetic_session
+
+    GLITCH_RATE = 0.15       # share of frames replaced by a random action
+
+    rng = random.Random(3)
+    clean = synthetic_session(duration=600.0, seed=3)
+    names = ['neutral', 'left', 'right', 'push', 'pull', 'lift', 'drop']
+    session = [(t, rng.choice(names), rng.uniform(0.4, 0.9)) if rng.random() < GLITCH_RATE
+               else (t, action, power) for t, action, power in clean]
+    threshold = 0.5
+
+    # intended clicks: separate holds of 'drop' in the clean session
+    intended = sum(1 for (_, a, _), (_, b, _) in zip([(0, None, 0)] + clean, clean)
+                   if b == 'drop' and a != 'drop')
+    raw_clicks = sum(1 for (_, a, pa), (_, b, pb) in zip([(0, None, 0)] + session, session)
+                     if b == 'drop' and pb > threshold and not (a == 'drop' and pa > threshold))
+
+    print(f"{len(session)} com frames ({len(session) / COM_RATE / 60:.0f} min), "
+          f"{GLITCH_RATE:.0%} glitches, {intended} intended drop holds")
+    print(f"ungated: {raw_clicks} clicks")
+    for mode in ('majority', 'weighted'):
+        gate = ActionGate(mode=mode)
+        clicks = []
+        gate.on_event(lambda e: clicks.append(e) if e.kind == 'enter' and e.action == 'drop' else None)
+        start = time.perf_counter()
+        for t, action, power in session:
+            gate.update(action if power > threshold else None, power, now=t)
+        cost = (time.perf_counter() - start) / len(session) * 1e6
+        stats = gate.stats()
+        print(f"{mode:>8}: {len(clicks)} clicks, {stats['enters']} enters from {stats['raw_onsets']} "
+              f"raw onsets ({stats['suppressed']} suppressed), enter latency "
+              f"{stats['enter_latency']['mean_ms']:.0f} ms mean / {stats['enter_latency']['max_ms']:.0f} ms max "
+              f"(bound {gate.latency_bound(1.0 / COM_RATE) * 1000:.0f} ms for a clean hold), "
+              f"exit latency {stats['exit_latency']['mean_ms']:.0f} ms, {cost:.1f} us/frame")
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+User input activity monitor
+===========================
+Detects when the *user* moves or clicks the mouse, so BCI control can back
+off while they do (the `timeDelay` manual override in main.py).
+
+With `pynput` installed the monitor subscribes to OS pointer events and
+costs nothing while the mouse is still. Without it, it falls back to polling
+the real cursor position with an adaptive interval: fast right after
+activity, backing off towards `max_interval` while idle. `max_interval`
+bounds how late the first manual move after an idle period is noticed, so
+it stays at the 100 ms of the old fixed-rate poll.
+
+Our own moves are recognised through `CursorState.was_ours`, so synthetic
+motion never counts as user activity. The BCI handler only needs the cheap
+query:
+
+    monitor = InputActivityMonitor(cursor)
+    monitor.start()
+    if monitor.active_within(timeDelay):
+        return
+"""
+
+import threading
+import time
+
+try:
+    from pynput import mouse as pynput_mouse
+except Exception:  # ImportError, or no display backend for pynput
+    pynput_mouse = None
+
+MIN_POLL_INTERVAL = 0.02     # seconds, right after user activity
+MAX_POLL_INTERVAL = 0.1      # seconds, after a long idle period (worst-case detection delay)
+POLL_BACKOFF = 1.5           # interval growth per idle poll
+SYNTHETIC_CLICK_WINDOW = 0.1  # clicks this soon after our own click are ours
+
+
+class InputActivityMonitor:
+    """Timestamps real user pointer activity, ignoring our own synthetic input."""
+
+    def __init__(self, cursor, on_user_activity=None, use_events=True,
+                 min_interval=MIN_POLL_INTERVAL, max_interval=MAX_POLL_INTERVAL):
+        self.cursor = cursor
+        self.on_user_activity = on_user_activity
+        self.use_events = use_events and pynput_mouse is not None
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+
+        self.last_activity = 0.0     # time.monotonic() of the last user action
+        self.user_events = 0
+        self.synthetic_events = 0
+        self.polls = 0
+
+        self._stop = threading.Event()
+        self._listener = None
+        self._thread = None
+
+    @property
+    def mode(self):
+        return 'events' if self.use_events else 'polling'
+
+    # ---- Queries ----
+    def idle_time(self):
+        """Seconds since the user last touched the mouse (inf if never)."""
+        if not self.last_activity:
+            return float('inf')
+        return time.monotonic() - self.last_activity
+
+    def active_within(self, seconds):
+        """True if the user moved or clicked within the last `seconds`."""
+        return self.last_activity > 0 and time.monotonic() - self.last_activity < seconds
+
+    # ---- Lifecycle ----
+    def start(self):
+        if self._listener is not None or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        if self.use_events:
+            self._listener = pynput_mouse.Listener(on_move=self._on_move, on_click=self._on_click,
+                                                   on_scroll=self._on_scroll)
+            self._listener.daemon = True
+            self._listener.start()
+        else:
+            self._thread = threading.Thread(target=self._poll_loop, name='InputActivityMonitor', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    # ---- Event handling ----
+    def _user_activity(self, x=None, y=None):
+        self.last_activity = time.monotonic()
+        self.user_events += 1
+        if x is not None:
+            self.cursor.on_external_move(x, y)
+        if self.on_user_activity is not None:
+            self.on_user_activity()
+
+    def _on_move(self, x, y, *args):
+        if self.cursor.was_ours(x, y):
+            self.synthetic_events += 1
+        else:
+            self._user_activity(x, y)
+
+    def _on_click(self, x, y, button, pressed, *args):
+        if time.monotonic() - self.cursor.last_click < SYNTHETIC_CLICK_WINDOW:
+            self.synthetic_events += 1
+        else:
+            self._user_activity()
+
+    def _on_scroll(self, x, y, dx, dy, *args):
+        self._user_activity()
+
+    def _poll_loop(self):
+        interval = self.max_interval
+        while not self._stop.wait(interval):
+            self.polls += 1
+            # the OS position: an OutputStage's pending target would hide the user
+            x, y = self.cursor.real_position()
+            if self.cursor.was_ours(x, y):
+                # idle (or only our own motion): back off
+                interval = min(interval * POLL_BACKOFF, self.max_interval)
+            else:
+                self._user_activity(x, y)
+                interval = self.min_interval
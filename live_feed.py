@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Live dashboard feed
+===================
+Serves one shared snapshot of the running state to any number of browser
+clients, instead of every page refresh rescanning the history:
+
+- `GET /stats.json` returns the latest snapshot;
+- `GET /stream` is a Server-Sent Events stream that pushes every new
+  snapshot as a `data:` line.
+
+A single broadcaster thread calls `build(previous)` at `rate` Hz while at
+least one client is connected, serializes the result once, and wakes all
+clients. `previous` is the snapshot built before (None at first), for
+values such as rates that are measured between snapshots. Clients never
+queue: a slow client simply skips to the newest snapshot, so the server's
+work is independent of the number of clients.
+
+    feed = SnapshotBroadcaster(build_snapshot, rate=4)
+    feed.register_routes(app)
+    feed.start()                 # once, at app setup
+    ...
+    feed.stop()                  # final: open streams end, new ones get nothing
+
+    // browser
+    new EventSource('/stream').onmessage = e => update(JSON.parse(e.data))
+
+Run this file directly for a load test with many concurrent clients on
+localhost.
+"""
+
+import json
+import threading
+import time
+
+STREAM_RATE = 4.0        # snapshots per second pushed to stream clients
+KEEPALIVE = 15.0         # seconds between SSE comments on an idle stream
+RETRY_MS = 2000          # browser reconnect delay after a dropped stream
+
+
+class SnapshotBroadcaster:
+    """Builds a snapshot at a fixed rate and fans it out to SSE clients."""
+
+    def __init__(self, build, rate=STREAM_RATE, keepalive=KEEPALIVE):
+        if rate <= 0:
+            raise ValueError(f'rate must be positive, not {rate}')
+        self.build = build
+        self.period = 1.0 / rate
+        self.keepalive = keepalive
+
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._payload = None      # serialized JSON of the newest snapshot
+        self._previous = None     # newest snapshot as built, passed to the next build
+        self._built_at = None
+        self.clients = 0
+        self.builds = 0
+        self.sent = 0
+
+        self._stop = threading.Event()
+        self._closed = False      # set by stop(); the broadcaster never restarts
+        self._thread = None
+
+    # ---- Snapshots ----
+    def _publish(self):
+        # caller holds self._cond
+        data = self.build(self._previous)
+        self._seq += 1
+        data['seq'] = self._seq
+        self._payload = json.dumps(data, separators=(',', ':')).encode()
+        self._previous = data
+        self._built_at = time.monotonic()
+        self.builds += 1
+        self._cond.notify_all()
+
+    def snapshot(self):
+        """Newest snapshot as JSON bytes; rebuilt only if older than one period."""
+        with self._cond:
+            if self._payload is None or time.monotonic() - self._built_at >= self.period:
+                self._publish()
+            return self._payload
+
+    # ---- Broadcaster thread ----
+    def start(self):
+        """Start the broadcaster thread; does nothing once stop() was called."""
+        if self._closed or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._thread = threading.Thread(target=self._run, name='SnapshotBroadcaster', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop for good: streams end and later start() calls are ignored."""
+        self._closed = True
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _run(self):
+        next_build = time.monotonic()
+        while not self._stop.is_set():
+            with self._cond:
+                # idle until someone listens
+                while self.clients == 0 and not self._stop.is_set():
+                    self._cond.wait()
+                    next_build = time.monotonic()
+            delay = next_build - time.monotonic()
+            if delay > 0 and self._stop.wait(delay):
+                break
+            with self._cond:
+                # /stats.json may have just built a fresh one
+                if self._built_at is None or time.monotonic() - self._built_at >= self.period * 0.5:
+                    try:
+                        self._publish()
+                    except Exception as e:
+                        print(f"[LiveFeed] Snapshot failed: {e}")
+            next_build += self.period
+            if next_build < time.monotonic():
+                next_build = time.monotonic()
+
+    # ---- Clients ----
+    def events(self):
+        """SSE byte chunks for one client; ends when the broadcaster stops.
+
+        Only the thread started by start() publishes; this never starts it.
+        """
+        if self._closed:
+            return
+        with self._cond:
+            self.clients += 1
+            self._cond.notify_all()
+        seen = 0
+        try:
+            yield f'retry: {RETRY_MS}\n\n'.encode()
+            while not self._stop.is_set():
+                with self._cond:
+                    if self._seq == seen:
+                        self._cond.wait(self.keepalive)
+                    seq, payload = self._seq, self._payload
+                    if seq != seen:
+                        self.sent += 1
+                if seq == seen:
+                    yield b': keepalive\n\n'
+                    continue
+                seen = seq
+                yield b'data: ' + payload + b'\n\n'
+        finally:
+            with self._cond:
+                self.clients -= 1
+
+    def register_routes(self, app, json_rule='/stats.json', stream_rule='/stream'):
+        """Add the snapshot and stream routes to a Flask app."""
+        from flask import Response
+
+        def snapshot_view():
+            return Response(self.snapshot(), mimetype='application/json')
+
+        def stream_view():
+            return Response(self.events(), mimetype='text/event-stream',
+                            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+        app.add_url_rule(json_rule, 'live_feed_snapshot', snapshot_view)
+        app.add_url_rule(stream_rule, 'live_feed_stream', stream_view)
+
+    def stats(self):
+        return {'clients': self.clients, 'builds': self.builds, 'sent': self.sent, 'seq': self._seq}
+
+
+if __name__ == "__main__":
+    # Load test: N stream clients plus /stats.json polling against a local
+    # Flask server, with a synthetic 8 Hz com producer behind the snapshot.
+    import http.client
+    import logging
+    import random
+    import statistics
+    import sys
+
+    from flask import Flask
+    from werkzeug.serving import make_server
+
+    from power_history import PowerHistory
+
+    CLIENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    DURATION = 5.0
+    POLLERS = 8
+
+    history = PowerHistory()
+    rng = random.Random(0)
+    producing = threading.Event()
+
+    def produce():
+        while not producing.wait(0.125):
+            history.append(rng.random(), rng.choice(['neutral', 'left', 'right', 'push']), time.time())
+
+    def build(previous):
+        power, actions, times = history.latest(8)
+        return {'time': time.time(), 'readings': len(history),
+                'batch': [[round(t, 3), a, round(float(p), 3)] for p, a, t in zip(power, actions, times)]}
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    app = Flask(__name__)
+    feed = SnapshotBroadcaster(build)
+    feed.register_routes(app)
+    feed.start()
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    port = server.server_port
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    threading.Thread(target=produce, daemon=True).start()
+
+    received = [0] * CLIENTS
+    delays = []
+    delays_lock = threading.Lock()
+    ready = threading.Barrier(CLIENTS + 1)
+
+    def client(k):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=DURATION + 5)
+        conn.request('GET', '/stream')
+        response = conn.getresponse()
+        ready.wait()
+        begin = time.time()
+        end = time.monotonic() + DURATION
+        local = []
+        while time.monotonic() < end:
+            line = response.readline()
+            if not line:
+                break
+            if line.startswith(b'data: '):
+                built = json.loads(line[6:])['time']
+                if built >= begin:      # skip snapshots queued while clients connected
+                    local.append(time.time() - built)
+                    received[k] += 1
+        conn.close()
+        with delays_lock:
+            delays.extend(local)
+
+    polls = [0]
+
+    def poller():
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        end = time.monotonic() + DURATION
+        while time.monotonic() < end:
+            conn.request('GET', '/stats.json')
+            conn.getresponse().read()
+            polls[0] += 1
+        conn.close()
+
+    threads = [threading.Thread(target=client, args=(k,)) for k in range(CLIENTS)]
+    for t in threads:
+        t.start()
+    ready.wait()
+    builds_before = feed.builds
+    pollers = [threading.Thread(target=poller) for _ in range(POLLERS)]
+    for t in pollers:
+        t.start()
+    for t in threads + pollers:
+        t.join()
+    builds = feed.builds - builds_before
+    producing.set()
+    feed.stop()
+    server.shutdown()
+
+    delays.sort()
+    print(f"{CLIENTS} stream clients + {POLLERS} /stats.json pollers for {DURATION:.0f} s at {STREAM_RATE:g} Hz")
+    print(f"snapshots built: {builds} (expected about {STREAM_RATE * DURATION:.0f}, independent of clients)")
+    print(f"events per client: min {min(received)}, median {statistics.median(received)}, max {max(received)}")
+    print(f"delivery delay: median {1000 * statistics.median(delays):.1f} ms, "
+          f"p99 {1000 * delays[int(0.99 * (len(delays) - 1))]:.1f} ms")
+    print(f"/stats.json: {polls[0] / DURATION:.0f} requests/s served from the shared snapshot")
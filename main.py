@@ -1,11 +1,19 @@
 import os
-import time
-import threading
 from dotenv import load_dotenv
 
-import pyautogui
 import cortex
 from cortex import Cortex
+from subscriptions import SubscriptionManager
+from motion import MotionEngine
+from backends import get_backend
+from cursor_state import CursorState
+from output_stage import OutputStage
+from input_monitor import InputActivityMonitor
+from stop_signal import stop_signal
+from action_map import ActionMap
+from gating import ActionGate
+from replay import ComRecorder
+from assist import CursorAssist
 
 # -----------------------------
 # Emotiv / Cortex setup copied from your working live.py
@@ -20,13 +28,36 @@ EMOTIV_CLIENT_SECRET="Zjdote3b8w2hxNDaearMcinzfUDXe5yeJPozmuEolPZ2ptTs8unFyu3WmB
 PROFILE_NAME="James"
 HEADSET_ID="INSIGHT2-A3D20A08"
 
-SPEED = 50
+SPEED = 50  # pixels per com frame at power 1.0
+COM_RATE = 8  # com frames per second sent by Cortex
+MOTION_RATE = 120  # cursor updates per second
 timeDelay = 3  # seconds to ignore BCI commands after mouse movement
+STOP_PORT = 5001  # GET/POST http://127.0.0.1:5001/stop stops cursor control
+SESSION_LOG = os.getenv("SESSION_LOG")  # optional: record com frames here for replay.py
+ASSIST_TARGETS = os.getenv("ASSIST_TARGETS")  # optional: JSON file of clickable rectangles
+ASSIST_MODE = os.getenv("ASSIST_MODE", "snap")  # 'snap' or 'bias' (see assist.py)
+GATE_MODE = os.getenv("GATE_MODE", "majority")  # 'majority' or 'weighted' vote (see gating.py)
 # HEADSET_ID = os.getenv("HEADSET_ID", "")  # optional
 
 
-mouse_x, mouse_y = 0, 0
-last_mouse_movement = 0
+# OS cursor access (pyautogui, direct X11 or virtual; see backends.py).
+# Position reads come from CursorState's cache, not the display server, and
+# OutputStage merges the motion engine's moves into one per display refresh;
+# its thread is started with the other workers in __main__.
+output = OutputStage(get_backend())
+cursor = CursorState(output)
+
+# Tells real user mouse activity apart from our own moves (manual override)
+input_monitor = InputActivityMonitor(cursor)
+
+# Mental command -> move/click mapping, from the "main" section of action_map.json
+actions = ActionMap('main', cursor=cursor)
+
+# A command acts only after winning a vote over the last few com frames
+gate = ActionGate(mode=GATE_MODE)
+
+# Optional target assistance: steer motion onto known buttons
+assist = CursorAssist(cursor, path=ASSIST_TARGETS, mode=ASSIST_MODE) if ASSIST_TARGETS else None
 
 
 
@@ -50,9 +81,12 @@ class LiveAdvance:
         self.c.bind(query_profile_done=self.on_query_profile_done)
         self.c.bind(load_unload_profile_done=self.on_load_unload_profile_done)
         self.c.bind(save_profile_done=self.on_save_profile_done)
-        self.c.bind(new_com_data=self.on_new_com_data)
-        self.c.bind(new_met_data=self.on_new_met_data)
-        self.c.bind(new_pow_data=self.on_new_pow_data)
+        # Stream handlers go through the subscription manager so that only
+        # streams with a listener are subscribed.
+        self.subscriptions = SubscriptionManager(self.c)
+        self.subscriptions.bind(new_com_data=self.on_new_com_data)
+        self.subscriptions.bind(new_met_data=self.on_new_met_data)
+        self.subscriptions.bind(new_pow_data=self.on_new_pow_data)
         self.c.bind(get_mc_active_action_done=self.on_get_mc_active_action_done)
         self.c.bind(mc_action_sensitivity_done=self.on_mc_action_sensitivity_done)
         self.c.bind(inform_error=self.on_inform_error)
@@ -115,7 +149,7 @@ class LiveAdvance:
 
     def on_save_profile_done (self, *args, **kwargs):
         print('Save profile', self.profile_name, "successfully")
-        self.c.sub_request(['com', 'met', 'pow'])
+        self.subscriptions.activate()
 
 
     def on_new_com_data(self, *args, **kwargs):
@@ -189,42 +223,55 @@ class SpotifyLive(LiveAdvance):
     """
     def __init__(self, app_client_id, app_client_secret, **kwargs):
         super().__init__(app_client_id, app_client_secret, **kwargs)
+        # Only mental commands drive the cursor; don't pay for met/pow streams.
+        self.subscriptions.unbind(new_met_data=self.on_new_met_data,
+                                  new_pow_data=self.on_new_pow_data)
+        # The cursor moves on its own clock; com frames only steer it.
+        self.motion = MotionEngine(move_cursor, actions.directions(), rate=MOTION_RATE,
+                                   max_speed=SPEED * COM_RATE, speed_scale=cursor.speed_scale)
+        self.motion.start()
+        actions.on_reload(self.on_actions_reload)
+        stop_signal.on_stop(self.on_stop)
+        if SESSION_LOG:
+            self.recorder = ComRecorder(SESSION_LOG)
+            self.subscriptions.bind(new_com_data=self.recorder.on_new_com_data)
+
+    def on_actions_reload(self, action_map):
+        self.motion.directions = action_map.directions()
+
+    def on_stop(self, reason):
+        self.motion.stop()
+        print(f"[Gate] {gate.stats()}")
 
     def on_new_com_data(self, *args, **kwargs):
-        global mouse_x, mouse_y
-        global last_mouse_movement
-
-
         data = kwargs.get('data', {}) or {}
         action = data.get('action')
         power = data.get('power', 0.0)
         print(f"[COM] action={action} power={power:.2f} time={data.get('time')}")
 
         # If mouse moved in last 5 seconds, ignore BCI commands to avoid conflicts.
-        if last_mouse_movement > time.time() - timeDelay:
+        if input_monitor.active_within(timeDelay):
+            gate.reset()
+            self.motion.set_command('neutral', 0.0)
             return
 
-        mouse_x, mouse_y = pyautogui.position()
-        displacement = round(SPEED * power)
-        # Threshold: 0.5 works well per your live script. Tweak if needed.
-
-        if action == 'push':
-            print("PUUUUSH")
-            mouse_y -= displacement
-
-        elif action == 'pull':
-            mouse_y += displacement
-
-        elif action == 'left':
-            mouse_x -= displacement
-
-        elif action == 'right':
-            mouse_x += displacement
+        # Frames below threshold vote for nothing; one stray frame can't click
+        binding = actions.lookup(action, power)
+        entered = gate.update(action if binding is not None else None, power)
+        binding = actions.table.get(gate.active) if gate.active is not None else None
+        if binding is None:
+            self.motion.set_command('neutral', 0.0)
+            return
+        if entered:
+            binding.fire(gate.power)
+        self.motion.set_command(gate.active, binding.gain(gate.power))
 
-        elif action == 'drop':
-            pyautogui.click()
 
-        pyautogui.moveTo(mouse_x, mouse_y, duration=0)
+def move_cursor(dx, dy):
+    """Relative move used by the motion engine."""
+    if assist is not None:
+        dx, dy = assist.adjust(dx, dy)
+    cursor.move_rel(dx, dy)
 
 # -----------------------------
 # Boot Emotiv Live (using the working flow)
@@ -240,26 +287,19 @@ def start_emotiv_live():
     _emotiv_instance = SpotifyLive(EMOTIV_CLIENT_ID, EMOTIV_CLIENT_SECRET)
     _emotiv_instance.start(PROFILE_NAME, HEADSET_ID)
 
-def mouse_checking_thread():
-    global mouse_x, mouse_y, last_mouse_movement
-    mouse_x, mouse_y = pyautogui.position()
-
-    while True:
-        new_mouse_x, new_mouse_y = pyautogui.position()
-
-        if (new_mouse_x, new_mouse_y) != (mouse_x, mouse_y):
-            mouse_x, mouse_y = new_mouse_x, new_mouse_y
-
-            last_mouse_movement = time.time()
-
-        time.sleep(0.1)
-
 # -----------------------------
 # Main
 # -----------------------------
 if __name__ == "__main__":
-    thread = threading.Thread(target=mouse_checking_thread)
-    thread.start()
+    # ESC, Ctrl+C and the HTTP stop endpoint share one kill switch
+    stop_signal.start(http_port=STOP_PORT)
+    stop_signal.on_stop(lambda reason: input_monitor.stop())
+    output.start()
+    stop_signal.on_stop(lambda reason: output.stop())
+    actions.watch()
+    cursor.screen.watch()
+    input_monitor.start()
+    print(f"[Input] Watching for user mouse activity ({input_monitor.mode})")
 
     _require_config()
     # Note: We kick off Emotiv after Spotify login so commands can do something immediately.
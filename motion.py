@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Fixed-rate cursor motion engine
+===============================
+Decouples cursor motion from the rate of mental-command frames. The latest
+action/power is turned into a target velocity, and a dedicated thread
+integrates velocity into position at a steady rate (60-240 Hz) with
+acceleration and decay time constants. Network jitter in the `com` stream
+then only changes the target, never the smoothness of the motion.
+
+    engine = MotionEngine(move_cursor, {'left': (-1, 0), 'right': (1, 0)})
+    engine.start()
+    ...
+    engine.set_command(action, power)     # from the Cortex callback
+
+`move_by(dx, dy)` is called with whole-pixel steps only; sub-pixel motion is
+carried over to the next frame.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+
+MOTION_RATE = 120        # integration rate in Hz
+MIN_RATE = 60            # accepted rates: smooth enough, and benchmarked up to MAX_RATE
+MAX_RATE = 240
+MAX_SPEED = 400.0        # px/s at power 1.0 (about SPEED=50 px per 8 Hz com frame)
+ACCEL_TIME = 0.12        # seconds to close ~63 % of the gap to a faster target
+DECAY_TIME = 0.20        # seconds to shed ~63 % of the speed when slowing down
+COMMAND_TIMEOUT = 0.35   # a command older than this counts as neutral
+GAIN_EXPONENT = 1.0      # speed = MAX_SPEED * power ** GAIN_EXPONENT
+STATS_WINDOW = 240       # frames used for the frame rate / jitter report
+
+
+class MotionEngine:
+    """Integrates the latest mental command into smooth cursor motion."""
+
+    def __init__(self, move_by, directions, rate=MOTION_RATE, max_speed=MAX_SPEED,
+                 accel_time=ACCEL_TIME, decay_time=DECAY_TIME,
+                 command_timeout=COMMAND_TIMEOUT, gain_exponent=GAIN_EXPONENT, speed_scale=None):
+        if not MIN_RATE <= rate <= MAX_RATE:
+            raise ValueError(f'rate must be between {MIN_RATE} and {MAX_RATE} Hz, not {rate}')
+        self.move_by = move_by
+        self.directions = dict(directions)
+        self.rate = rate
+        self.period = 1.0 / rate
+        self.max_speed = max_speed
+        self.accel_time = accel_time
+        self.decay_time = decay_time
+        self.command_timeout = command_timeout
+        self.gain_exponent = gain_exponent
+        self.speed_scale = speed_scale    # optional callable, e.g. per-monitor speed
+
+        # (action, power, received_at), replaced atomically by set_command
+        self._command = (None, 0.0, 0.0)
+        self.vx = self.vy = 0.0
+        self._rx = self._ry = 0.0   # sub-pixel remainders
+
+        self._stop = threading.Event()
+        self._thread = None
+        self._intervals = deque(maxlen=STATS_WINDOW)
+        self._lateness = deque(maxlen=STATS_WINDOW)
+        self.frames = 0
+        self.skipped = 0
+
+    # ---- Input ----
+    def set_command(self, action, power, now=None):
+        """Record the newest command; safe to call from any thread."""
+        self._command = (action, power, time.perf_counter() if now is None else now)
+
+    def target_velocity(self, now):
+        action, power, received = self._command
+        direction = self.directions.get(action)
+        if direction is None or now - received > self.command_timeout:
+            return 0.0, 0.0
+        speed = self.max_speed * max(0.0, min(power, 1.0)) ** self.gain_exponent
+        if self.speed_scale is not None:
+            speed *= self.speed_scale()
+        return direction[0] * speed, direction[1] * speed
+
+    # ---- Integration ----
+    def step(self, dt, now):
+        """Advance the model by `dt` seconds; returns the whole-pixel move (dx, dy)."""
+        tx, ty = self.target_velocity(now)
+        speeding_up = tx * tx + ty * ty > self.vx * self.vx + self.vy * self.vy
+        tau = self.accel_time if speeding_up else self.decay_time
+        alpha = 1.0 - math.exp(-dt / tau) if tau > 0 else 1.0
+        self.vx += (tx - self.vx) * alpha
+        self.vy += (ty - self.vy) * alpha
+        if abs(self.vx) < 0.5 and abs(self.vy) < 0.5 and tx == 0.0 and ty == 0.0:
+            self.vx = self.vy = 0.0
+
+        self._rx += self.vx * dt
+        self._ry += self.vy * dt
+        dx = int(self._rx)
+        dy = int(self._ry)
+        self._rx -= dx
+        self._ry -= dy
+        return dx, dy
+
+    # ---- Thread ----
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='MotionEngine', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        period = self.period
+        last = time.perf_counter()
+        deadline = last + period
+        while not self._stop.is_set():
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                self._stop.wait(delay)
+            now = time.perf_counter()
+
+            self._intervals.append(now - last)
+            self._lateness.append(max(0.0, now - deadline))
+            dx, dy = self.step(now - last, now)
+            last = now
+            if dx or dy:
+                self.move_by(dx, dy)
+            self.frames += 1
+
+            deadline += period
+            if now - deadline > period:
+                # fell more than a frame behind: drop the backlog instead of bursting
+                missed = int((now - deadline) / period)
+                self.skipped += missed
+                deadline += missed * period
+
+    def stats(self):
+        """Achieved frame rate and jitter over the last STATS_WINDOW frames."""
+        intervals = list(self._intervals)
+        if len(intervals) < 2:
+            return {'fps': 0.0, 'jitter_ms': 0.0, 'max_late_ms': 0.0,
+                    'frames': self.frames, 'skipped': self.skipped}
+        mean = sum(intervals) / len(intervals)
+        variance = sum((i - mean) ** 2 for i in intervals) / len(intervals)
+        return {
+            'fps': 1.0 / mean if mean > 0 else 0.0,
+            'jitter_ms': math.sqrt(variance) * 1e3,
+            'max_late_ms': max(self._lateness) * 1e3,
+            'frames': self.frames,
+            'skipped': self.skipped,
+        }
+
+
+if __name__ == "__main__":
+    # Headless check of the achieved rate: feed a command at a jittery ~8 Hz.
+    import random
+
+    moved = [0, 0]
+
+    def record(dx, dy):
+        moved[0] += dx
+        moved[1] += dy
+
+    for rate in (60, 120, 240):
+        engine = MotionEngine(record, {'right': (1, 0)}, rate=rate)
+        engine.start()
+        end = time.perf_counter() + 2.0
+        while time.perf_counter() < end:
+            engine.set_command('right', 0.8)
+            time.sleep(0.125 + random.uniform(-0.05, 0.05))
+        engine.stop()
+        s = engine.stats()
+        print(f"target {rate:>3} Hz: achieved {s['fps']:6.1f} Hz, jitter {s['jitter_ms']:.2f} ms, "
+              f"max late {s['max_late_ms']:.2f} ms, skipped {s['skipped']}")
@@ -6,10 +6,15 @@ from dotenv import load_dotenv
 from flask import Flask, redirect, request, jsonify, session
 import cortex
 from cortex import Cortex
+from subscriptions import SubscriptionManager
+from backends import get_backend
+from cursor_state import CursorState
+from output_stage import OutputStage
+from actuator import ActuatorWorker
+from stop_signal import stop_signal
+from action_map import ActionMap
+from thresholds import AdaptiveThresholds
 
-import pyautogui
-import time
-import threading
 import sys
 
 
@@ -17,24 +22,14 @@ import sys
 DURATION = 0.01 # Animation duration in seconds
 PIXELS_PER_MOVE = 10
 
-# Global flag for interrupt handling
-interrupted = False
+# OS cursor access (pyautogui, direct X11 or virtual; see backends.py).
+# Position reads are cached and re-synced at most once per second; OutputStage
+# drops no-op moves and merges the rest into one per display refresh. Its
+# thread is started by SpotifyLive together with the actuator.
+output = OutputStage(get_backend())
+cursor = CursorState(output, max_age=1.0)
 
 
-def monitor_escape_key():
-    """Monitor for escape key press in a separate thread."""
-    global interrupted
-    try:
-        import keyboard
-        print("Press ESC to interrupt the movement at any time...")
-        keyboard.wait('esc')
-        interrupted = True
-        print("\nEscape key detected! Stopping movement...")
-    except ImportError:
-        print("Note: 'keyboard' library not available. Use Ctrl+C to interrupt.")
-    except Exception as e:
-        print(f"Keyboard monitoring error: {e}")
-
 # -----------------------------
 # Flask / Spotify setup
 # -----------------------------
@@ -42,6 +37,8 @@ load_dotenv()
 
 app = Flask(__name__)
 app.secret_key = 'Your Spotify Key'
+# POST/GET /stop raises the shared stop signal (same as ESC / Ctrl+C)
+stop_signal.register_route(app)
 
 # Global (in-memory) token for demo purposes
 access_token_global = None
@@ -54,6 +51,12 @@ EMOTIV_CLIENT_SECRET = os.getenv("CLIENT_SECRET", "")
 PROFILE_NAME = os.getenv("PROFILE_NAME", "TRAW spins")
 HEADSET_ID = os.getenv("HEADSET_ID", "")  # optional
 
+# Per-action trigger levels learned from live power, saved per profile
+thresholds = AdaptiveThresholds(PROFILE_NAME)
+
+# Mental command -> cursor effect, from the "mouse_demo" section of action_map.json
+actions = ActionMap('mouse_demo', cursor=cursor, thresholds=thresholds)
+
 def _require_config():
     missing = []
     if not EMOTIV_CLIENT_ID or not EMOTIV_CLIENT_SECRET:
@@ -74,7 +77,8 @@ class LiveAdvance:
         self.c.bind(query_profile_done=self.on_query_profile_done)
         self.c.bind(load_unload_profile_done=self.on_load_unload_profile_done)
         self.c.bind(save_profile_done=self.on_save_profile_done)
-        self.c.bind(new_com_data=self.on_new_com_data)
+        self.subscriptions = SubscriptionManager(self.c)
+        self.subscriptions.bind(new_com_data=self.on_new_com_data)
         self.c.bind(get_mc_active_action_done=self.on_get_mc_active_action_done)
         self.c.bind(mc_action_sensitivity_done=self.on_mc_action_sensitivity_done)
         self.c.bind(inform_error=self.on_inform_error)
@@ -137,7 +141,7 @@ class LiveAdvance:
 
     def on_save_profile_done (self, *args, **kwargs):
         print('Save profile', self.profile_name, "successfully")
-        self.c.sub_request(['com'])
+        self.subscriptions.activate()
 
     def on_new_com_data(self, *args, **kwargs):
         # Default: just print. We'll override this in SpotifyLive.
@@ -189,6 +193,18 @@ class SpotifyLive(LiveAdvance):
     """
     def __init__(self, app_client_id, app_client_secret, **kwargs):
         super().__init__(app_client_id, app_client_secret, **kwargs)
+        # Cursor work runs on its own thread; the websocket thread only enqueues
+        # the newest command, and a held command is re-applied every DURATION until
+        # no new com frame arrives for MAX_HOLD (see actuator.py).
+        self.actuator = ActuatorWorker(self.actuate, repeat_interval=DURATION, name='CursorActuator')
+        # Disable the corner fail-safe for smooth movement (restored on stop)
+        cursor.set_failsafe(False)
+        self._fired = None      # last command whose click/key effects ran
+        output.start()
+        self.actuator.start()
+        actions.watch()
+        stop_signal.start()
+        stop_signal.on_stop(self.on_stop)
 
     def on_new_com_data(self, *args, **kwargs):
         global access_token_global
@@ -197,60 +213,53 @@ class SpotifyLive(LiveAdvance):
         power = data.get('power', 0.0)
         print(f"[COM] action={action} power={power:.2f} time={data.get('time')}")
 
+        # Learned once per frame here, not in actuate(), which repeats commands
+        thresholds.update(action, power)
+        # Returns immediately; an older command not yet acted on is dropped
+        self.actuator.submit((action, power))
+
         if not access_token_global:
             # Mildly inconvenient truth, not sugar-coated.
             print("[Spotify] No access token yet. Log in at /login.")
             return
 
-        # Threshold: 0.5 works well per your live script. Tweak if needed.
-        if action == 'lift' and power > 0.5:
+        # Per-action adaptive threshold (0.5 until calibrated)
+        if action == 'lift' and power > thresholds.threshold(action):
             print("🎯 LIFT detected -> Spotify PAUSE")
             # spotify_pause(access_token_global)
-        elif action == 'drop' and power > 0.5:
+        elif action == 'drop' and power > thresholds.threshold(action):
             print("🔄 DROP detected -> Spotify RESUME")
             # spotify_resume(access_token_global)
         elif action == 'neutral':
             print("😐 Neutral state - no action")
 
+    def actuate(self, command):
+        """Move the cursor one step for (action, power); runs on the actuator thread."""
+        if stop_signal.is_stopped():
+            return
 
-        try:
-            # Disable PyAutoGUI fail-safe temporarily for smooth movement
-            pyautogui.FAILSAFE = False
-
-            # Start keyboard monitoring thread
-            keyboard_thread = threading.Thread(target=monitor_escape_key, daemon=True)
-            keyboard_thread.start()
-
-            # Main animation loop
-            while not interrupted:
-                # Get initial cursor position as circle center
-                x, y = pyautogui.position()
-
-                dx = 0
-                dy = 0
-
-                if action == 'left' and power > 0.5:
-                    print("LEFT")
-                    dx -= 1
-                if action == 'right' and power > 0.5:
-                    print("RIGHT")
-                    dx += 1
-
-                if action == 'lift' and power > 0.5:
-                    dy -= 1
-                if action == 'drop' and power > 0.5:
-                    dy += 1
+        action, power = command
+        binding = actions.lookup(action, power)
+        if binding is None:
+            return
 
-                # Calculate new position
-                x += PIXELS_PER_MOVE * dx
-                y += PIXELS_PER_MOVE * dy
+        # Repeats of a held command only move; clicks/keys fire once per command
+        if command is not self._fired:
+            self._fired = command
+            binding.fire(power)
 
-                # Maintain frame rate
-                time.sleep(DURATION)
+        if binding.move:
+            dx, dy = binding.move
+            step = PIXELS_PER_MOVE * binding.gain(power) * cursor.speed_scale()
+            cursor.move_rel(step * dx, step * dy)
 
-        finally:
-            # Re-enable PyAutoGUI fail-safe
-            pyautogui.FAILSAFE = True
+    def on_stop(self, reason):
+        self.actuator.stop()
+        output.stop()
+        actions.stop()
+        thresholds.save()
+        # Re-enable the corner fail-safe
+        cursor.set_failsafe(True)
 
 
 
@@ -270,7 +279,6 @@ def start_emotiv_live():
     _emotiv_instance.start(PROFILE_NAME, HEADSET_ID)
 
     """Main animation loop for circular mouse movement."""
-    global interrupted
 
 
     # try:
@@ -318,6 +326,8 @@ def start_emotiv_live():
 # -----------------------------
 if __name__ == "__main__":
     _require_config()
+    # ESC and Ctrl+C handlers are installed once, from the main thread
+    stop_signal.start()
     # Note: We kick off Emotiv after Spotify login so commands can do something immediately.
     # If you prefer to start Emotiv immediately, uncomment the next line:
     # start_emotiv_live()
@@ -6,8 +6,16 @@ from dotenv import load_dotenv
 from flask import Flask, redirect, request, jsonify, session
 import cortex
 from cortex import Cortex
+from subscriptions import SubscriptionManager
+from backends import get_backend
+from cursor_state import CursorState
+from output_stage import OutputStage
+from power_history import PowerHistory, HISTORY_CAPACITY
+from stop_signal import stop_signal
+from action_map import ActionMap
+from live_feed import SnapshotBroadcaster
+from thresholds import AdaptiveThresholds
 
-import pyautogui
 import time
 import threading
 import sys
@@ -20,87 +28,186 @@ DURATION = 0.01  # Animation duration in seconds
 PIXELS_PER_MOVE = 10
 
 # Enhanced power monitoring configuration
+# Starting levels; once calibrated, each action uses its own learned levels
 POWER_THRESHOLD = 0.3  # Lowered from 0.5 for better sensitivity
 ACTION_THRESHOLD = 0.5  # Higher threshold for actual actions
-POWER_HISTORY_SIZE = 20  # Number of power readings to keep for averaging
-UPDATE_RATE_LIMIT = 0.1  # Minimum time between power meter updates (seconds)
+POWER_HISTORY_SIZE = int(os.getenv("POWER_HISTORY_SIZE", "20"))  # Readings in the avg/min/max window (thousands are fine)
+UPDATE_RATE_LIMIT = 0.1  # Power meter refresh period (seconds), drawn off the com thread
+CURSOR_RESYNC_INTERVAL = 1.0  # Re-read the real cursor position at most this often (seconds)
+MOVE_INTERVAL = DURATION  # Minimum time between cursor moves while a direction is held (seconds)
+CLICK_INTERVAL = 0.5  # Minimum time between clicks (seconds)
+STREAM_RATE = float(os.getenv("STREAM_RATE", "4"))  # /stream dashboard updates per second
+STREAM_BATCH = 64  # Most readings sent per /stream update
 
 # Global flags and state
-interrupted = False
 mouse_control_active = False
 last_power_update = 0
 
 
 class PowerMonitor:
-    """Enhanced power monitoring and visualization system."""
+    """Enhanced power monitoring and visualization system.
+
+    Every reading goes into a columnar `PowerHistory` (the last
+    `capacity` readings, for per-action queries on /stats). Average, min and
+    max over the last `history_size` readings are kept up to date as
+    readings arrive: a running sum for the average and monotonic deques of
+    (index, power) for min and max. Adding a reading and every query are
+    O(1) amortized, whatever the window size.
+
+    The console meter is drawn by a renderer thread (`start()`), not by
+    `add_reading`: the com thread only publishes the newest reading, and the
+    renderer redraws at a fixed rate when it changed.
+    """
 
-    def __init__(self, history_size=POWER_HISTORY_SIZE):
-        self.power_history = deque(maxlen=history_size)
-        self.last_update = 0
+    def __init__(self, history_size=POWER_HISTORY_SIZE, thresholds=None, capacity=HISTORY_CAPACITY):
+        self.history = PowerHistory(max(capacity, history_size))
+        self.history_size = history_size
+        self.thresholds = thresholds
         self.update_interval = UPDATE_RATE_LIMIT
+        self.latest = None        # (index, power, action, avg, max) of the newest reading
+        self.redraws = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+        self._lock = threading.Lock()
+        self._count = 0           # readings added so far; index of the next one
+        self._sum = 0.0           # sum of the powers in the history window
+        self._max = deque()       # (index, power), powers decreasing: front is the max
+        self._min = deque()       # (index, power), powers increasing: front is the min
 
     def add_reading(self, power, action):
         """Add a new power reading to the history."""
         timestamp = time.time()
-        self.power_history.append({
-            'power': power,
-            'action': action,
-            'timestamp': timestamp
-        })
-
-        # Update display if enough time has passed
-        if timestamp - self.last_update > self.update_interval:
-            self.display_power_meter(power, action)
-            self.last_update = timestamp
-
-    def display_power_meter(self, current_power, current_action):
-        """Display live power meter with visual feedback."""
+        with self._lock:
+            history = self.history
+            if self._count >= self.history_size:
+                self._sum -= history.power_at(self.history_size - 1)
+            history.append(power, action, timestamp)
+            # sum, min and max all see the value as stored (float32), so they agree
+            # with each other and with history queries, and the sum stays exact
+            power = history.power_at(0)
+            self._sum += power
+
+            index = self._count
+            self._count = index + 1
+            oldest = index - self.history_size     # indices <= oldest left the window
+            maxima, minima = self._max, self._min
+            while maxima and maxima[-1][1] <= power:
+                maxima.pop()
+            maxima.append((index, power))
+            if maxima[0][0] <= oldest:
+                maxima.popleft()
+            while minima and minima[-1][1] >= power:
+                minima.pop()
+            minima.append((index, power))
+            if minima[0][0] <= oldest:
+                minima.popleft()
+
+            # Publish for the renderer: one tuple assignment, read without a lock
+            self.latest = (index, power, action, self._sum / min(self._count, self.history_size),
+                           maxima[0][1])
+
+    # ---- Meter renderer ----
+    def start(self):
+        """Redraw the console meter every `update_interval` on a background thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='PowerMeter', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+
+    def _run(self):
+        seen = None
+        line = None
+        next_frame = time.monotonic()
+        while not self._stop.is_set():
+            latest = self.latest
+            if latest is not None and latest[0] != seen:
+                seen = latest[0]
+                new_line, triggered = self.render_power_meter(*latest[1:])
+                # Only touch the terminal when the meter actually changed
+                if new_line != line or triggered:
+                    line = new_line
+                    sys.stdout.write(line)
+                    if triggered:
+                        sys.stdout.write(f"\n🎯 ACTION TRIGGERED: {latest[2]} (power: {latest[1]:.3f})\n")
+                    sys.stdout.flush()
+                    self.redraws += 1
+            # fixed refresh rate against absolute deadlines, skipping missed frames
+            next_frame += self.update_interval
+            delay = next_frame - time.monotonic()
+            if delay < 0:
+                next_frame = time.monotonic()
+                delay = 0
+            self._stop.wait(delay)
+
+    def render_power_meter(self, current_power, current_action, avg_power, max_power):
+        """Meter line for a reading, and whether it crossed the action level."""
         # Create ASCII power bar
         bar_length = 50
         filled_length = int(bar_length * min(current_power, 1.0))
         bar = '█' * filled_length + '░' * (bar_length - filled_length)
 
-        # Get power statistics
-        avg_power = self.get_average_power()
-        max_power = self.get_max_power()
-
         # Color coding for different power levels
-        if current_power > ACTION_THRESHOLD:
+        if self.thresholds is not None:
+            action_level = self.thresholds.threshold(current_action)
+            power_level = self.thresholds.medium(current_action)
+        else:
+            action_level, power_level = ACTION_THRESHOLD, POWER_THRESHOLD
+        if current_power > action_level:
             power_status = "🔥 HIGH"
-        elif current_power > POWER_THRESHOLD:
+        elif current_power > power_level:
             power_status = "⚡ MED"
         else:
             power_status = "💤 LOW"
 
-        # Clear previous line and display new meter
-        print(f"\r🧠 [{bar}] {current_power:.3f} | Avg: {avg_power:.3f} | Max: {max_power:.3f} | {current_action:>8} | {power_status}", end="", flush=True)
+        # \r returns to the start of the line, so each redraw replaces the last
+        line = (f"\r🧠 [{bar}] {current_power:.3f} | Avg: {avg_power:.3f} | Max: {max_power:.3f} | "
+                f"{current_action:>8} | {power_status}")
+        return line, current_power > action_level
 
-        # Print newline for significant events
-        if current_power > ACTION_THRESHOLD:
-            print(f"\n🎯 ACTION TRIGGERED: {current_action} (power: {current_power:.3f})")
+    @property
+    def readings(self):
+        """Number of readings in the avg/min/max window."""
+        return min(self._count, self.history_size)
 
     def get_average_power(self):
-        """Calculate average power from recent history."""
-        if not self.power_history:
-            return 0.0
-        return sum(reading['power'] for reading in self.power_history) / len(self.power_history)
+        """Average power over the history window."""
+        with self._lock:
+            count = min(self._count, self.history_size)
+            # the running sum can drift a few ulps below zero; never report that
+            return max(self._sum, 0.0) / count if count else 0.0
 
     def get_max_power(self):
-        """Get maximum power from recent history."""
-        if not self.power_history:
-            return 0.0
-        return max(reading['power'] for reading in self.power_history)
+        """Maximum power over the history window."""
+        with self._lock:
+            return self._max[0][1] if self._max else 0.0
+
+    def get_min_power(self):
+        """Minimum power over the history window."""
+        with self._lock:
+            return self._min[0][1] if self._min else 0.0
+
+    def recent_actions(self, count=5):
+        """Actions of the newest `count` readings, oldest first."""
+        return self.history.latest(count)[1]
 
     def print_stats(self):
         """Print detailed power statistics."""
-        if not self.power_history:
+        if not self.readings:
             print("\n📊 No power data available yet")
             return
 
         avg = self.get_average_power()
         max_val = self.get_max_power()
-        min_val = min(reading['power'] for reading in self.power_history)
-        recent_actions = [r['action'] for r in list(self.power_history)[-5:]]
+        min_val = self.get_min_power()
+        recent_actions = self.recent_actions()
 
         print(f"\n📊 POWER STATISTICS:")
         print(f"   Average: {avg:.3f}")
@@ -110,110 +217,144 @@ class PowerMonitor:
 
 
 class MouseController:
-    """Separate mouse control logic from data reception."""
+    """Separate mouse control logic from data reception.
+
+    The control thread sleeps on a condition variable: it wakes when
+    `update_command` delivers a new command, or when the next move of a held
+    direction command is due. With no actionable command it does not wake at
+    all. Moves and clicks are rate limited independently.
+
+    What each command does comes from the "mouse_demo_enhanced" section of
+    action_map.json, which is reloaded while running.
+    """
 
-    def __init__(self):
+    def __init__(self, cursor=None, move_interval=MOVE_INTERVAL, click_interval=CLICK_INTERVAL,
+                 actions=None, output=None):
+        if cursor is None:
+            output = OutputStage(get_backend())
+            cursor = CursorState(output, max_age=CURSOR_RESYNC_INTERVAL)
+        self.cursor = cursor
+        self.output = output        # OutputStage under the cursor, run with the control thread
+        self.actions = actions or ActionMap('mouse_demo_enhanced', cursor=self.cursor)
         self.active = False
         self.last_action = None
         self.last_power = 0.0
         self.control_thread = None
-        self.keyboard_thread = None
+
+        self.move_interval = move_interval
+        self.click_interval = click_interval
+        self._cond = threading.Condition()
+        self._version = 0           # bumped by every update_command
+        self._last_move = 0.0
+        self._last_click = 0.0
+
+        # counters for /stats and tuning
+        self.wakeups = 0
+        self.moves = 0
+        self.clicks = 0
+        self.clicks_suppressed = 0
 
     def start_control(self):
         """Start mouse control in a separate thread."""
         if self.active:
             return
 
+        # ESC / Ctrl+C / GET /stop all end up in stop_control. A stop from an
+        # earlier run leaves the shared signal raised; this is a new run.
+        stop_signal.start()
+        stop_signal.reset()
+
         self.active = True
+        if self.output is not None:
+            self.output.start()
         self.control_thread = threading.Thread(target=self._control_loop, daemon=True)
         self.control_thread.start()
+        self.actions.watch()
+        stop_signal.on_stop(self.stop_control)
 
-        # Start keyboard monitoring
-        self.keyboard_thread = threading.Thread(target=self._monitor_escape_key, daemon=True)
-        self.keyboard_thread.start()
-
-    def stop_control(self):
+    def stop_control(self, reason=None):
         """Stop mouse control."""
         self.active = False
-        global interrupted
-        interrupted = True
+        self.actions.stop()
+        with self._cond:
+            self._cond.notify_all()
+        if self.output is not None:
+            self.output.stop()
 
     def update_command(self, action, power):
-        """Update the current mouse command."""
-        self.last_action = action
-        self.last_power = power
-
-    def _monitor_escape_key(self):
-        """Monitor for escape key press in a separate thread."""
-        try:
-            import keyboard
-            print("\n🎮 Mouse control active - Press ESC to stop movement...")
-            keyboard.wait('esc')
-            self.stop_control()
-            print("\n⛔ Escape key detected! Stopping mouse control...")
-        except ImportError:
-            print("\nNote: 'keyboard' library not available. Use Ctrl+C to interrupt.")
-        except Exception as e:
-            print(f"Keyboard monitoring error: {e}")
+        """Update the current mouse command and wake the control thread."""
+        with self._cond:
+            self.last_action = action
+            self.last_power = power
+            self._version += 1
+            self._cond.notify()
+
+    def _wait_for_work(self, seen):
+        """Block until there is a new command or a held move is due.
+
+        Returns (action, power, is_new, version), or None once stopped.
+        """
+        with self._cond:
+            while self.active and not stop_signal.is_stopped():
+                if self._version != seen:
+                    return self.last_action, self.last_power, True, self._version
+                binding = self.actions.lookup(self.last_action, self.last_power)
+                if binding is not None and binding.move:
+                    due = self._last_move + self.move_interval - time.monotonic()
+                    if due <= 0:
+                        return self.last_action, self.last_power, False, seen
+                    self._cond.wait(due)
+                else:
+                    # nothing to do until a new command arrives
+                    self._cond.wait()
+            return None
 
     def _control_loop(self):
         """Main mouse control loop running in separate thread."""
-        global interrupted
+        seen = self._version
 
         try:
-            # Disable PyAutoGUI fail-safe temporarily for smooth movement
-            pyautogui.FAILSAFE = False
+            # Disable the corner fail-safe temporarily for smooth movement
+            self.cursor.set_failsafe(False)
 
             print("\n🖱️  Mouse control started - move your cursor with mental commands!")
 
-            while self.active and not interrupted:
-                if self.last_power > ACTION_THRESHOLD and self.last_action:
-                    dx, dy = 0, 0
-
-                    # Map mental commands to mouse movements
-                    if self.last_action == 'left':
-                        dx = -1
-                    elif self.last_action == 'right':
-                        dx = 1
-                    elif self.last_action == 'lift':
-                        dy = -1
-                    elif self.last_action == 'drop':
-                        dy = 1
-                    elif self.last_action == 'push':
-                        # Click action
-                        print("🖱️  CLICK!")
-                        pyautogui.click()
-                        continue
-
-                    # Move mouse if there's a direction
-                    if dx != 0 or dy != 0:
-                        current_x, current_y = pyautogui.position()
-                        new_x = current_x + (PIXELS_PER_MOVE * dx * self.last_power)
-                        new_y = current_y + (PIXELS_PER_MOVE * dy * self.last_power)
-                        pyautogui.moveTo(new_x, new_y, duration=0)
-
-                time.sleep(DURATION)
+            while True:
+                work = self._wait_for_work(seen)
+                if work is None:
+                    break
+                action, power, is_new, seen = work
+                self.wakeups += 1
+
+                binding = self.actions.lookup(action, power)
+                if binding is None:
+                    continue
+                now = time.monotonic()
+
+                if binding.effects and is_new:
+                    # Click (or key/callable) once per new command, at most every click_interval
+                    if now - self._last_click < self.click_interval:
+                        self.clicks_suppressed += 1
+                    else:
+                        print(f"🖱️  {action.upper()} -> {binding}")
+                        binding.fire(power)
+                        self._last_click = now
+                        self.clicks += 1
+
+                if not binding.move or now - self._last_move < self.move_interval:
+                    continue
+                dx, dy = binding.move
+                step = PIXELS_PER_MOVE * binding.gain(power) * self.cursor.speed_scale()
+                self.cursor.move_rel(step * dx, step * dy)
+                self._last_move = now
+                self.moves += 1
 
         finally:
-            # Re-enable PyAutoGUI fail-safe
-            pyautogui.FAILSAFE = True
+            # Re-enable the corner fail-safe
+            self.cursor.set_failsafe(True)
             print("\n🛑 Mouse control stopped")
 
 
-def monitor_escape_key():
-    """Monitor for escape key press in a separate thread."""
-    global interrupted
-    try:
-        import keyboard
-        print("Press ESC to interrupt the movement at any time...")
-        keyboard.wait('esc')
-        interrupted = True
-        print("\nEscape key detected! Stopping movement...")
-    except ImportError:
-        print("Note: 'keyboard' library not available. Use Ctrl+C to interrupt.")
-    except Exception as e:
-        print(f"Keyboard monitoring error: {e}")
-
 # -----------------------------
 # Flask / Spotify setup
 # -----------------------------
@@ -221,14 +362,12 @@ load_dotenv()
 
 app = Flask(__name__)
 app.secret_key = 'Your Spotify Key'
+# POST/GET /stop raises the shared stop signal (same as ESC / Ctrl+C)
+stop_signal.register_route(app)
 
 # Global (in-memory) token for demo purposes
 access_token_global = None
 
-# Initialize global components
-power_monitor = PowerMonitor()
-mouse_controller = MouseController()
-
 # -----------------------------
 # Emotiv / Cortex setup copied from your working live.py
 # -----------------------------
@@ -237,6 +376,15 @@ EMOTIV_CLIENT_SECRET = os.getenv("CLIENT_SECRET", "")
 PROFILE_NAME = os.getenv("PROFILE_NAME", "demo-app")  # Fixed default value
 HEADSET_ID = os.getenv("HEADSET_ID", "")  # optional
 
+# Initialize global components
+output = OutputStage(get_backend())      # started by mouse_controller.start_control()
+cursor = CursorState(output, max_age=CURSOR_RESYNC_INTERVAL)
+thresholds = AdaptiveThresholds(PROFILE_NAME, default=ACTION_THRESHOLD, default_medium=POWER_THRESHOLD)
+power_monitor = PowerMonitor(thresholds=thresholds)
+mouse_controller = MouseController(
+    cursor, actions=ActionMap('mouse_demo_enhanced', cursor=cursor, thresholds=thresholds),
+    output=output)
+
 def _require_config():
     missing = []
     if not EMOTIV_CLIENT_ID or not EMOTIV_CLIENT_SECRET:
@@ -257,7 +405,8 @@ class LiveAdvance:
         self.c.bind(query_profile_done=self.on_query_profile_done)
         self.c.bind(load_unload_profile_done=self.on_load_unload_profile_done)
         self.c.bind(save_profile_done=self.on_save_profile_done)
-        self.c.bind(new_com_data=self.on_new_com_data)
+        self.subscriptions = SubscriptionManager(self.c)
+        self.subscriptions.bind(new_com_data=self.on_new_com_data)
         self.c.bind(get_mc_active_action_done=self.on_get_mc_active_action_done)
         self.c.bind(mc_action_sensitivity_done=self.on_mc_action_sensitivity_done)
         self.c.bind(inform_error=self.on_inform_error)
@@ -320,7 +469,7 @@ class LiveAdvance:
 
     def on_save_profile_done(self, *args, **kwargs):
         print('Save profile', self.profile_name, "successfully")
-        self.c.sub_request(['com'])
+        self.subscriptions.activate()
         # Power monitoring will start automatically when com data arrives
         print("\n🎯 Starting enhanced power monitoring...")
 
@@ -374,6 +523,11 @@ class SpotifyLive(LiveAdvance):
     """
     def __init__(self, app_client_id, app_client_secret, **kwargs):
         super().__init__(app_client_id, app_client_secret, **kwargs)
+        # Cursor work happens on the controller thread; this handler only
+        # hands it the newest command and returns.
+        mouse_controller.start_control()
+        power_monitor.start()
+        stop_signal.on_stop(self.on_stop)
 
     def on_new_com_data(self, *args, **kwargs):
         global access_token_global, power_monitor
@@ -382,72 +536,39 @@ class SpotifyLive(LiveAdvance):
         power = data.get('power', 0.0)
         print(f"[COM] action={action} power={power:.2f} time={data.get('time')}")
 
-        # Add to power monitor for continuous feedback
+        # Learn this action's power levels, then show them on the meter
+        thresholds.update(action, power)
         power_monitor.add_reading(power, action)
 
+        # Latest command wins; one the controller has not acted on yet is replaced
+        mouse_controller.update_command(action, power)
+
         if not access_token_global:
             # Mildly inconvenient truth, not sugar-coated.
             print("[Spotify] No access token yet. Log in at /login.")
             return
 
-        # Threshold: 0.5 works well per your live script. Tweak if needed.
+        # Per-action adaptive threshold (0.5 until calibrated)
+        triggered = power > thresholds.threshold(action)
 
         print("power = ", power)
 
-        if action == 'lift' and power > 0.5:
+        if action == 'lift' and triggered:
             print("🎯 LIFT detected")
             # spotify_pause(access_token_global)
-        elif action == 'pull' and power > 0.5:
+        elif action == 'pull' and triggered:
             print("🔄 PULL detected")
             # spotify_resume(access_token_global)
         elif action == 'neutral':
             print("😐 Neutral state - no action")
-        elif action == 'push' and power > 0.5:
+        elif action == 'push' and triggered:
             print("PUSH")
 
-        try:
-            # Disable PyAutoGUI fail-safe temporarily for smooth movement
-            pyautogui.FAILSAFE = False
-
-            # Start keyboard monitoring thread
-            keyboard_thread = threading.Thread(target=monitor_escape_key, daemon=True)
-            keyboard_thread.start()
-
-            # Main animation loop
-            while not interrupted:
-                # Get initial cursor position as circle center
-                x, y = pyautogui.position()
-
-                dx = 0
-                dy = 0
-
-                if action == 'left' and power > 0.5:
-                    print("LEFT")
-                    dx -= 1
-                if action == 'right' and power > 0.5:
-                    print("RIGHT")
-                    dx += 1
-
-                if action == 'lift' and power > 0.5:
-                    print("lift")
-                    dy -= 1
-                if action == 'drop' and power > 0.5:
-                    print("drop")
-                    dy += 1
-
-                if action == 'push' and power > 0.5:
-                    print("push")
-
-                # Calculate new position
-                x += PIXELS_PER_MOVE * dx
-                y += PIXELS_PER_MOVE * dy
-
-                # Maintain frame rate
-                time.sleep(DURATION)
-
-        finally:
-            # Re-enable PyAutoGUI fail-safe
-            pyautogui.FAILSAFE = True
+    def on_stop(self, reason):
+        power_monitor.stop()
+        live_feed.stop()
+        # Keep what was learned for the next session with this profile
+        thresholds.save()
 
 
 # -----------------------------
@@ -468,8 +589,8 @@ def home():
     <h2>Controls:</h2>
     <ul>
         <li><strong>Mental Commands:</strong> lift, drop, left, right, push</li>
-        <li><strong>Power Threshold:</strong> 0.5 (hardcoded as original)</li>
-        <li><strong>ESC:</strong> Stop mouse control</li>
+        <li><strong>Power Threshold:</strong> learned per action after calibration (<a href="/calibrate">recalibrate</a>)</li>
+        <li><strong>ESC / Ctrl+C / <a href="/stop">/stop</a>:</strong> Stop mouse control</li>
     </ul>
     <h2>Status:</h2>
     <p>Power Monitor: <strong>READY</strong></p>
@@ -484,28 +605,114 @@ def start_demo():
     except Exception as e:
         return f'<h1>❌ Error starting demo:</h1><p>{str(e)}</p><a href="/">← Back</a>'
 
+def live_snapshot(previous):
+    """State shared by /stats.json and every /stream client (built once per update)."""
+    history = power_monitor.history
+    now = time.time()
+    total = history.total
+    if previous is None:
+        new, elapsed = total, 0.0
+    else:
+        new, elapsed = total - previous['total'], now - previous['time']
+    # readings since the previous snapshot, sent as one batch
+    powers, actions, times = history.latest(min(new, STREAM_BATCH))
+    latest = power_monitor.latest
+    return {
+        'time': now,
+        'total': total,
+        'power': latest[1] if latest else 0.0,
+        'action': latest[2] if latest else None,
+        'average': power_monitor.get_average_power(),
+        'max': power_monitor.get_max_power(),
+        'min': power_monitor.get_min_power(),
+        'readings': power_monitor.readings,
+        'kept': len(history),
+        'rates': {'com_per_sec': new / elapsed if elapsed > 0 else 0.0,
+                  'meter_redraws': power_monitor.redraws},
+        'controller': {'active': mouse_controller.active,
+                       'action': mouse_controller.last_action,
+                       'power': mouse_controller.last_power},
+        'thresholds': thresholds.summary(),
+        'batch': [[round(t, 3), a, round(float(p), 3)] for p, a, t in zip(powers, actions, times)],
+    }
+
+# GET /stats.json (snapshot) and /stream (Server-Sent Events), one shared snapshot for all clients;
+# the broadcaster thread is started with the app, below
+live_feed = SnapshotBroadcaster(live_snapshot, rate=STREAM_RATE)
+live_feed.register_routes(app)
+
 @app.route('/stats')
 def show_stats():
     """Web endpoint to show power statistics."""
-    if not power_monitor.power_history:
+    if not power_monitor.readings:
         return '<h1>📊 No data available yet</h1><a href="/">← Back</a>'
 
+    # Per-action breakdown over the last ?window= seconds (default: all kept)
+    window = request.args.get('window', type=float)
+    since = time.time() - window if window else None
+    rows = ''.join(
+        f"<tr><td>{action}</td><td>{s['count']}</td><td>{s['mean']:.3f}</td><td>{s['p50']:.3f}</td>"
+        f"<td>{s['p90']:.3f}</td><td>{s['p99']:.3f}</td><td>{s['max']:.3f}</td>"
+        f"<td style=\"font-family: monospace\">{_sparkline(s['histogram'])}</td></tr>"
+        for action, s in sorted(power_monitor.history.summary(since=since).items()))
+
     avg = power_monitor.get_average_power()
     max_val = power_monitor.get_max_power()
-    min_val = min(reading['power'] for reading in power_monitor.power_history)
+    min_val = power_monitor.get_min_power()
+    levels = ''.join(
+        f"<li><strong>{action}:</strong> trigger {level['threshold']:.3f}, medium {level['medium']:.3f}"
+        f"{'' if level['calibrated'] else ' (calibrating, %d samples)' % level['samples']}</li>"
+        for action, level in thresholds.summary().items())
 
     return f'''
     <h1>📊 Live Power Statistics</h1>
     <ul>
-        <li><strong>Average Power:</strong> {avg:.3f}</li>
-        <li><strong>Maximum Power:</strong> {max_val:.3f}</li>
-        <li><strong>Minimum Power:</strong> {min_val:.3f}</li>
-        <li><strong>Readings Count:</strong> {len(power_monitor.power_history)}</li>
-        <li><strong>Mouse Control:</strong> {"ACTIVE" if mouse_controller.active else "INACTIVE"}</li>
+        <li><strong>Power:</strong> <span id="power">-</span> (<span id="action">-</span>, <span id="rate">-</span> frames/s)</li>
+        <li><strong>Average Power:</strong> <span id="average">{avg:.3f}</span></li>
+        <li><strong>Maximum Power:</strong> <span id="max">{max_val:.3f}</span></li>
+        <li><strong>Minimum Power:</strong> <span id="min">{min_val:.3f}</span></li>
+        <li><strong>Readings Count:</strong> <span id="readings">{power_monitor.readings} ({len(power_monitor.history)} kept)</span></li>
+        <li><strong>Mouse Control:</strong> <span id="control">{"ACTIVE" if mouse_controller.active else "INACTIVE"}</span></li>
     </ul>
-    <a href="/stats">🔄 Refresh</a> | <a href="/">← Back</a>
+    <script>
+    // Live values from /stream; the table below is computed when the page loads
+    const set = (id, text) => document.getElementById(id).textContent = text;
+    new EventSource('/stream').onmessage = (e) => {{
+        const s = JSON.parse(e.data);
+        set('power', s.power.toFixed(3));
+        set('action', s.action);
+        set('rate', s.rates.com_per_sec.toFixed(1));
+        set('average', s.average.toFixed(3));
+        set('max', s.max.toFixed(3));
+        set('min', s.min.toFixed(3));
+        set('readings', `${{s.readings}} (${{s.kept}} kept)`);
+        set('control', s.controller.active ? `ACTIVE (${{s.controller.action}})` : 'INACTIVE');
+    }};
+    </script>
+    <h2>Per action ({f"last {window:g} s" if window else "all kept readings"})</h2>
+    <table border="1" cellpadding="4">
+        <tr><th>Action</th><th>Count</th><th>Mean</th><th>p50</th><th>p90</th><th>p99</th><th>Max</th><th>Power 0→1</th></tr>
+        {rows}
+    </table>
+    <p><a href="/stats?window=60">Last minute</a> | <a href="/stats?window=600">Last 10 min</a> | <a href="/stats">All</a></p>
+    <h2>Thresholds ({PROFILE_NAME})</h2>
+    <ul>{levels or '<li>Calibrating...</li>'}</ul>
+    <a href="/stats">🔄 Refresh</a> | <a href="/calibrate">Recalibrate</a> | <a href="/">← Back</a>
     '''
 
+def _sparkline(counts):
+    """Histogram counts as a row of block characters."""
+    top = max(counts) or 1
+    return ''.join(' ▁▂▃▄▅▆▇█'[round(8 * c / top)] for c in counts)
+
+@app.route('/calibrate')
+def calibrate():
+    """Forget the learned thresholds and calibrate again from live data."""
+    thresholds.start_calibration()
+    return (f'<h1>🎯 Calibrating</h1><p>Hold each command for about '
+            f'{thresholds.calibration_frames // 8} s; defaults apply until then.</p>'
+            '<a href="/stats">📊 Stats</a> | <a href="/">← Back</a>')
+
 # -----------------------------
 # Boot Enhanced Emotiv Live
 # -----------------------------
@@ -515,17 +722,24 @@ def start_emotiv_live():
     global _emotiv_instance
 
     if _emotiv_instance is not None:
-        print("[Emotiv] Live already started.")
+        if mouse_controller.active:
+            print("[Emotiv] Live already started.")
+        else:
+            # stopped with ESC / GET /stop: the session is still up, resume control
+            print("[Emotiv] Resuming mouse control.")
+            mouse_controller.start_control()
+            power_monitor.start()
         return
 
     print("=" * 60)
     print("🚀 STARTING ENHANCED VIRTUAL CURSOR DEMO")
     print("=" * 60)
     print(f"⚙️  Configuration:")
-    print(f"   Power Threshold: {POWER_THRESHOLD}")
-    print(f"   Action Threshold: {ACTION_THRESHOLD}")
+    print(f"   Power Threshold: {POWER_THRESHOLD} (until calibrated)")
+    print(f"   Action Threshold: {ACTION_THRESHOLD} (until calibrated)")
+    print(f"   Calibration: {thresholds.calibration_frames} frames per action, saved to {thresholds.path}")
     print(f"   Profile: {PROFILE_NAME}")
-    print(f"   Update Rate: {UPDATE_RATE_LIMIT}s")
+    print(f"   Meter Refresh: {UPDATE_RATE_LIMIT}s")
     print("=" * 60)
 
     _emotiv_instance = SpotifyLive(EMOTIV_CLIENT_ID, EMOTIV_CLIENT_SECRET)
@@ -536,6 +750,9 @@ def start_emotiv_live():
 # -----------------------------
 if __name__ == "__main__":
     _require_config()
+    # ESC and Ctrl+C handlers are installed once, from the main thread
+    stop_signal.start()
+    live_feed.start()
 
     print("🎯 Enhanced Virtual Cursor Demo")
     print("Visit http://127.0.0.1:5000 for web interface")
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Cursor output stage
+===================
+Sits between the control code and a cursor backend and cuts the number of
+OS calls:
+
+- moves that would not change the position are dropped;
+- moves requested between two output ticks are merged into one (absolute
+  targets: latest wins; relative deltas: summed);
+- moves and clicks/key presses each pass through a token bucket, so a burst
+  of commands cannot flood the display server. Moves over the limit stay
+  pending and are merged into the next move; clicks over the limit are
+  dropped, counted in `stats()` and logged. They are not queued: a delayed
+  click would land wherever the cursor has moved to since.
+
+It implements the backend interface, so it slots in under `CursorState`:
+
+    output = OutputStage(get_backend())
+    cursor = CursorState(output)
+    output.start()          # with the other workers, not at import
+    ...
+    output.stop()
+
+Pending moves are flushed by a tick thread at `rate` Hz that sleeps while
+nothing is pending, and synchronously before every click. Without the
+thread (or with `tick()` called by hand, as in the replay below) moves are
+only sent on ticks and clicks.
+"""
+
+import threading
+import time
+
+from backends import CursorBackend
+
+OUTPUT_RATE = 60     # output ticks per second (one merged move per display refresh)
+MOVE_RATE = 60.0     # token bucket: sustained moves per second
+MOVE_BURST = 4       # token bucket: moves allowed back to back
+CLICK_RATE = 2.0     # token bucket: sustained clicks/key presses per second
+CLICK_BURST = 2
+
+
+class TokenBucket:
+    """Classic token bucket; `take()` is True when an action may proceed."""
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.stamp = clock()
+
+    def _refill(self, now):
+        if now > self.stamp:
+            self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+            self.stamp = now
+
+    def take(self):
+        self._refill(self.clock())
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+    def wait_time(self):
+        """Seconds until the next token is available."""
+        self._refill(self.clock())
+        return 0.0 if self.tokens >= 1.0 else (1.0 - self.tokens) / self.rate
+
+
+class OutputStage(CursorBackend):
+    """Backend wrapper that drops, merges and rate limits cursor output."""
+
+    def __init__(self, backend, rate=OUTPUT_RATE, move_rate=MOVE_RATE, move_burst=MOVE_BURST,
+                 click_rate=CLICK_RATE, click_burst=CLICK_BURST, clock=time.monotonic):
+        self.backend = backend
+        self.name = 'coalesced-' + backend.name
+        self.period = 1.0 / rate
+        self.clock = clock     # injectable for simulated-time replays
+        self.move_bucket = TokenBucket(move_rate, move_burst, clock)
+        self.click_bucket = TokenBucket(click_rate, click_burst, clock)
+
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()     # keeps flushed moves and clicks in order
+        self._target = None                  # pending absolute target
+        self._dx = self._dy = 0              # pending relative motion
+        self._issued = None                  # last absolute position sent to the backend
+        self._last_flush = 0.0
+
+        self.started_at = clock()
+        self.move_requests = 0
+        self.moves = 0
+        self.noop_moves = 0
+        self.click_requests = 0
+        self.clicks = 0
+        self.clicks_dropped = 0
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ---- Reads ----
+    def position(self):
+        with self._cond:
+            if self._target is not None:
+                return self._target[0] + self._dx, self._target[1] + self._dy
+        return self.backend.position()
+
+    def real_position(self):
+        # skips the pending target: what the backend shows, not where we're going
+        return self.backend.real_position()
+
+    def size(self):
+        return self.backend.size()
+
+    # ---- Moves ----
+    def move_to(self, x, y):
+        target = (int(x), int(y))
+        with self._cond:
+            self.move_requests += 1
+            if self._dx == 0 and self._dy == 0 and target == (self._target or self._issued):
+                self.noop_moves += 1
+                return
+            self._target = target
+            self._dx = self._dy = 0
+            self._cond.notify()
+
+    def move_rel(self, dx, dy):
+        dx, dy = int(dx), int(dy)
+        with self._cond:
+            self.move_requests += 1
+            if dx == 0 and dy == 0:
+                self.noop_moves += 1
+                return
+            self._dx += dx
+            self._dy += dy
+            self._cond.notify()
+
+    def _pending(self):
+        return self._target is not None or self._dx != 0 or self._dy != 0
+
+    def tick(self, force=False):
+        """Send the merged pending move, if any and the move bucket allows it."""
+        with self._io_lock:
+            with self._cond:
+                if not self._pending():
+                    return False
+                if not force and not self.move_bucket.take():
+                    return False
+                target, dx, dy = self._target, self._dx, self._dy
+                self._target = None
+                self._dx = self._dy = 0
+                self._last_flush = self.clock()
+                if target is not None:
+                    target = (target[0] + dx, target[1] + dy)
+                    if target == self._issued:
+                        self.noop_moves += 1
+                        return False
+                    self._issued = target
+                elif dx == 0 and dy == 0:
+                    # relative moves cancelled each other out
+                    self.noop_moves += 1
+                    return False
+                else:
+                    self._issued = None
+            if target is not None:
+                self.backend.move_to(*target)
+            else:
+                self.backend.move_rel(dx, dy)
+            self.moves += 1
+            return True
+
+    # ---- Clicks ----
+    def _discrete(self, call, *args):
+        self.click_requests += 1
+        # the click has to land where the cursor was asked to be
+        self.tick(force=True)
+        if not self.click_bucket.take():
+            self.clicks_dropped += 1
+            print(f"[OutputStage] Click rate limit ({self.click_bucket.rate:g}/s): dropped "
+                  f"{call.__name__}{args!r}, {self.clicks_dropped} dropped so far")
+            return False
+        with self._io_lock:
+            call(*args)
+        self.clicks += 1
+        return True
+
+    def click(self, button='left'):
+        return self._discrete(self.backend.click, button)
+
+    def press(self, key):
+        return self._discrete(self.backend.press, key)
+
+    def set_failsafe(self, enabled):
+        self.backend.set_failsafe(enabled)
+
+    # ---- Tick thread ----
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='OutputStage', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.tick(force=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self._cond:
+                while not self._pending() and not self._stop.is_set():
+                    self._cond.wait()
+            # at most one move per output tick
+            delay = self._last_flush + self.period - self.clock()
+            if delay > 0 and self._stop.wait(delay):
+                break
+            if not self.tick():
+                self._stop.wait(max(self.move_bucket.wait_time(), self.period / 4))
+
+    # ---- Reporting ----
+    def stats(self, elapsed=None):
+        """Call counts and OS calls saved per minute."""
+        elapsed = self.clock() - self.started_at if elapsed is None else elapsed
+        # only merged and no-op moves are savings; a dropped click is a lost action
+        saved = self.move_requests - self.moves
+        return {
+            'move_requests': self.move_requests,
+            'moves': self.moves,
+            'noop_moves': self.noop_moves,
+            'merged_moves': self.move_requests - self.moves - self.noop_moves,
+            'click_requests': self.click_requests,
+            'clicks': self.clicks,
+            'clicks_dropped': self.clicks_dropped,
+            'calls_saved': saved,
+            'saved_per_minute': saved * 60.0 / elapsed if elapsed > 0 else 0.0,
+        }
+
+
+if __name__ == "__main__":
+    # Replay a session through main.py's control path (ActionGate vote,
+    # motion engine at MOTION_RATE, click when 'drop' enters the gate) with
+    # and without the output stage, on a simulated clock so a long session
+    # runs in a moment.
+    import sys
+
+    from backends import VirtualBackend
+    from cursor_state import CursorState
+    from gating import ActionGate
+    from motion import MotionEngine, MOTION_RATE
+    from replay import load_session, synthetic_session
+
+    DIRECTIONS = {'push': (0, -1), 'pull': (0, 1), 'left': (-1, 0), 'right': (1, 0)}
+
+    if len(sys.argv) > 1:
+        session = load_session(sys.argv[1])
+        source = sys.argv[1]
+    else:
+        session = synthetic_session(duration=300.0)
+        source = 'synthetic 5 min session'
+    duration = session[-1][0] if session else 0.0
+
+    def simulate(use_stage):
+        backend = VirtualBackend(record=False)
+        calls = {'move': 0, 'click': 0}
+        counting = CountingBackend(backend, calls)
+        clock = [0.0]
+        stage = OutputStage(counting, clock=lambda: clock[0]) if use_stage else None
+        cursor = CursorState(stage or counting)
+        engine = MotionEngine(cursor.move_rel, DIRECTIONS, rate=MOTION_RATE, max_speed=400.0)
+        gate = ActionGate()
+
+        frame = 0
+        dt = 1.0 / MOTION_RATE
+        next_output = 0.0
+        now = 0.0
+        while now <= duration:
+            while frame < len(session) and session[frame][0] <= now:
+                t, action, power = session[frame]
+                # action_map.json "main": directions move, drop clicks, no threshold
+                bound = action in DIRECTIONS or action == 'drop'
+                if gate.update(action if bound else None, power, now=t) and gate.active == 'drop':
+                    cursor.click()
+                if gate.active is None:
+                    engine.set_command('neutral', 0.0, now=now)
+                else:
+                    engine.set_command(gate.active, gate.power, now=now)
+                frame += 1
+            dx, dy = engine.step(dt, now)
+            if dx or dy:
+                engine.move_by(dx, dy)
+            if stage is not None and now >= next_output:
+                stage.tick()
+                next_output += stage.period
+            now += dt
+            clock[0] = now
+        return calls, stage
+
+    class CountingBackend(CursorBackend):
+        name = 'counting'
+
+        def __init__(self, backend, calls):
+            self.backend = backend
+            self.calls = calls
+
+        def position(self):
+            return self.backend.position()
+
+        def size(self):
+            return self.backend.size()
+
+        def move_to(self, x, y):
+            self.calls['move'] += 1
+            self.backend.move_to(x, y)
+
+        def move_rel(self, dx, dy):
+            self.calls['move'] += 1
+            self.backend.move_rel(dx, dy)
+
+        def click(self, button='left'):
+            self.calls['click'] += 1
+
+        def press(self, key):
+            self.calls['click'] += 1
+
+    baseline, _ = simulate(False)
+    staged, stage = simulate(True)
+    minutes = duration / 60.0
+    before = baseline['move'] + baseline['click']
+    after = staged['move'] + staged['click']
+    print(f"Session: {source}, {len(session)} com frames over {duration:.0f} s")
+    print(f"without output stage: {baseline['move']} moves, {baseline['click']} clicks "
+          f"({before / minutes:.0f} OS calls/min)")
+    print(f"with output stage:    {staged['move']} moves, {staged['click']} clicks "
+          f"({after / minutes:.0f} OS calls/min)")
+    saved = baseline['move'] - staged['move']
+    print(f"saved {saved / minutes:.0f} move calls/min ({100.0 * saved / baseline['move']:.0f} % of moves)")
+    print(f"clicks dropped by the rate limit: {baseline['click'] - staged['click']} "
+          f"(lost actions, not savings)")
+    print(stage.stats(elapsed=duration))
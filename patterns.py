@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Motion pattern library
+======================
+Vectorized cursor paths for demos and tests: circle, figure-8, spiral,
+Lissajous curves and smooth curves through waypoints (Catmull-Rom segments
+as cubic Béziers). Every generator takes a frame count and returns an
+(frames x 2) float array of offsets from the pattern's center, eased in and
+out by the same speed profile as `trajectory.ease_in_out`.
+
+Generators are cached by their parameters with LRU eviction, so repeated
+demos and test runs reuse a path instead of recomputing it. The cached arrays
+are read-only; `path()` offsets one to a screen position and rounds it to
+pixels, ready for `trajectory.play`:
+
+    p = path('figure8', center=(960, 540), duration=4.0, fps=60, width=300, height=150)
+    play(p, cursor.move_to, fps=60)
+
+Waypoints for `bezier` must be hashable: a tuple of (x, y) tuples.
+"""
+
+import math
+from functools import lru_cache
+
+import numpy as np
+
+from trajectory import EASE, ease_in_out, frame_count, to_pixels
+
+PATTERN_CACHE_SIZE = 32   # cached paths per pattern
+
+
+def _frozen(points):
+    points.setflags(write=False)
+    return points
+
+
+def _angles(frames, turns, ease, start_angle=0.0):
+    return start_angle + 2.0 * math.pi * turns * ease_in_out(frames, ease)
+
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def circle(frames, radius=100, rotations=1, ease=EASE, start_angle=0.0):
+    angle = _angles(frames, rotations, ease, start_angle)
+    return _frozen(np.column_stack((radius * np.cos(angle), radius * np.sin(angle))))
+
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def figure8(frames, width=300, height=150, loops=1, ease=EASE):
+    """Lemniscate of Gerono: crosses itself at the center."""
+    angle = _angles(frames, loops, ease)
+    return _frozen(np.column_stack((0.5 * width * np.sin(angle),
+                                    height * np.sin(angle) * np.cos(angle))))
+
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def spiral(frames, start_radius=10, end_radius=150, turns=3, ease=EASE):
+    """Archimedean spiral from start_radius out to end_radius."""
+    progress = ease_in_out(frames, ease)
+    angle = 2.0 * math.pi * turns * progress
+    radius = start_radius + (end_radius - start_radius) * progress
+    return _frozen(np.column_stack((radius * np.cos(angle), radius * np.sin(angle))))
+
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def lissajous(frames, width=300, height=200, freq_x=3, freq_y=2, phase=math.pi / 2,
+              cycles=1, ease=EASE):
+    t = _angles(frames, cycles, ease)
+    return _frozen(np.column_stack((0.5 * width * np.sin(freq_x * t + phase),
+                                    0.5 * height * np.sin(freq_y * t))))
+
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def bezier(frames, waypoints, closed=False, ease=EASE):
+    """Smooth curve through `waypoints` (Catmull-Rom as cubic Bézier segments)."""
+    points = np.asarray(waypoints, dtype=float)
+    if points.ndim != 2 or points.shape[1] != 2 or len(points) < 2:
+        raise ValueError('waypoints must be at least two (x, y) pairs')
+    if closed:
+        points = np.vstack((points, points[:1]))
+        before = np.vstack((points[-2:-1], points[:-1]))
+        after = np.vstack((points[2:], points[1:2]))
+    else:
+        before = np.vstack((points[:1], points[:-1]))
+        after = np.vstack((points[2:], points[-1:]))
+    p0, p3 = points[:-1], points[1:]
+    # Catmull-Rom tangents give the inner Bézier control points
+    p1 = p0 + (p3 - before[:-1]) / 6.0
+    p2 = p3 - (after - p0) / 6.0
+
+    segments = len(p0)
+    s = ease_in_out(frames, ease) * segments
+    index = np.minimum(s.astype(int), segments - 1)
+    t = (s - index)[:, None]
+    u = 1.0 - t
+    curve = (u ** 3 * p0[index] + 3 * u * u * t * p1[index]
+             + 3 * u * t * t * p2[index] + t ** 3 * p3[index])
+    return _frozen(curve)
+
+
+PATTERNS = {
+    'circle': circle,
+    'figure8': figure8,
+    'spiral': spiral,
+    'lissajous': lissajous,
+    'bezier': bezier,
+}
+
+
+def path(name, center, duration, fps, **params):
+    """Pixel path for pattern `name` around `center`, for `trajectory.play`."""
+    try:
+        generate = PATTERNS[name]
+    except KeyError:
+        raise ValueError(f"Unknown pattern {name!r}; choose from {', '.join(PATTERNS)}") from None
+    if 'waypoints' in params:
+        params['waypoints'] = tuple(tuple(point) for point in params['waypoints'])
+    offsets = generate(frame_count(duration, fps), **params)
+    return to_pixels(offsets + center)
+
+
+def cache_stats():
+    """{pattern: functools cache info} for every generator."""
+    return {name: generate.cache_info() for name, generate in PATTERNS.items()}
+
+
+def clear_cache():
+    for generate in PATTERNS.values():
+        generate.cache_clear()
+
+
+if __name__ == "__main__":
+    # Generation time vs cache hits, per pattern.
+    import time
+
+    repeats = 200
+    waypoints = ((0, 0), (200, -80), (350, 60), (120, 200), (-100, 120))
+    params = {
+        'circle': {'radius': 100, 'rotations': 2},
+        'figure8': {'width': 300, 'height': 150},
+        'spiral': {'turns': 4},
+        'lissajous': {'freq_x': 5, 'freq_y': 4},
+        'bezier': {'waypoints': waypoints, 'closed': True},
+    }
+    for frames in (300, 3000):
+        for name, generate in PATTERNS.items():
+            clear_cache()
+            start = time.perf_counter()
+            generate(frames, **params[name])
+            cold = time.perf_counter() - start
+            start = time.perf_counter()
+            for _ in range(repeats):
+                generate(frames, **params[name])
+            hit = (time.perf_counter() - start) / repeats
+            print(f"{name:<10} {frames:>5} frames: generate {cold * 1e6:8.1f} us, "
+                  f"cache hit {hit * 1e6:6.2f} us ({cold / hit:6.0f}x)")
+    print(cache_stats())
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Columnar mental-command power history
+=====================================
+Keeps every `com` reading of a session in three preallocated NumPy columns
+instead of one Python object per reading:
+
+    power   float32   4 bytes
+    action  uint8     1 byte   (code into `actions`, up to 256 names)
+    time    float64   8 bytes
+
+13 bytes per reading against about 110 for a `PowerReading` in a deque, so
+an hour of 8 Hz com data fits in under 400 KB. Queries select a time window
+with a vectorized mask and answer per-action questions in one pass:
+
+    history = PowerHistory(capacity=28800)
+    history.append(power, action, timestamp)
+    history.mean('left', since=now - 60)
+    history.percentiles((50, 90), action='push')
+    counts, edges = history.histogram(bins=10, since=now - 300)
+    history.summary(since=now - 60)      # {action: {count, mean, p50, ...}}
+
+Appends are O(1). Queries copy the selected columns under the lock and do
+the math outside it, so a slow `/stats` request never blocks the com thread
+for more than the copy.
+"""
+
+import threading
+
+import numpy as np
+
+HISTORY_CAPACITY = 28800       # readings kept (one hour of com at 8 Hz)
+PERCENTILES = (50, 90, 99)     # reported by summary()
+HISTOGRAM_BINS = 10            # power bins over 0..1
+
+
+class PowerHistory:
+    """Fixed-capacity ring of (power, action, time) readings in NumPy columns."""
+
+    def __init__(self, capacity=HISTORY_CAPACITY):
+        self.capacity = capacity
+        self.power = np.zeros(capacity, dtype=np.float32)
+        self.action = np.zeros(capacity, dtype=np.uint8)
+        self.time = np.zeros(capacity, dtype=np.float64)
+        self.index = 0           # next write position
+        self.total = 0           # readings written since creation
+        self.actions = []        # code -> action name
+        self._codes = {}         # action name -> code
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def code(self, action):
+        """uint8 code for `action`, assigned on first use."""
+        code = self._codes.get(action)
+        if code is None:
+            if len(self.actions) >= 256:
+                raise ValueError('PowerHistory supports at most 256 distinct actions')
+            code = self._codes[action] = len(self.actions)
+            self.actions.append(action)
+        return code
+
+    def append(self, power, action, timestamp):
+        with self._lock:
+            i = self.index
+            self.power[i] = power
+            self.action[i] = self.code(action)
+            self.time[i] = timestamp
+            self.index = (i + 1) % self.capacity
+            self.total += 1
+
+    # ---- Reads ----
+    def power_at(self, age):
+        """Power of the reading `age` steps back (0 = newest)."""
+        return float(self.power[(self.index - 1 - age) % self.capacity])
+
+    def latest(self, n):
+        """Newest `n` readings, oldest first, as (power, actions, times)."""
+        with self._lock:
+            n = min(n, len(self))
+            order = (np.arange(self.index - n, self.index)) % self.capacity
+            power, codes, times = self.power[order], self.action[order], self.time[order]
+        return power, [self.actions[c] for c in codes], times
+
+    def select(self, since=None, until=None, action=None):
+        """Copies of the (power, codes, times) columns inside the time window.
+
+        Rows are in storage order, not time order; every query here is
+        order-independent.
+        """
+        with self._lock:
+            n = len(self)
+            power = self.power[:n].copy()
+            codes = self.action[:n].copy()
+            times = self.time[:n].copy()
+            code = self._codes.get(action) if action is not None else None
+        mask = None
+        if since is not None:
+            mask = times >= since
+        if until is not None:
+            mask = times < until if mask is None else mask & (times < until)
+        if action is not None:
+            if code is None:
+                empty = np.zeros(0, dtype=np.float32)
+                return empty, np.zeros(0, dtype=np.uint8), np.zeros(0)
+            match = codes == code
+            mask = match if mask is None else mask & match
+        if mask is None:
+            return power, codes, times
+        return power[mask], codes[mask], times[mask]
+
+    # ---- Queries ----
+    def mean(self, action=None, since=None, until=None):
+        power = self.select(since, until, action)[0]
+        return float(power.mean(dtype=np.float64)) if power.size else 0.0
+
+    def percentiles(self, qs=PERCENTILES, action=None, since=None, until=None):
+        power = self.select(since, until, action)[0]
+        if not power.size:
+            return [0.0] * len(qs)
+        return [float(v) for v in np.percentile(power, qs)]
+
+    def histogram(self, bins=HISTOGRAM_BINS, action=None, since=None, until=None):
+        """(counts, edges) of power over 0..1."""
+        power = self.select(since, until, action)[0]
+        return np.histogram(power, bins=bins, range=(0.0, 1.0))
+
+    def summary(self, since=None, until=None, qs=PERCENTILES, bins=HISTOGRAM_BINS):
+        """Per-action count, mean, min, max, percentiles and histogram."""
+        power, codes, _ = self.select(since, until)
+        if not power.size:
+            return {}
+        counts = np.bincount(codes, minlength=len(self.actions))
+        sums = np.bincount(codes, weights=power, minlength=len(self.actions))
+        # one stable sort groups every action's powers for the percentiles
+        order = np.argsort(codes, kind='stable')
+        grouped = power[order]
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        result = {}
+        for code in np.flatnonzero(counts):
+            values = grouped[starts[code]:starts[code] + counts[code]]
+            entry = {
+                'count': int(counts[code]),
+                'mean': float(sums[code] / counts[code]),
+                'min': float(values.min()),
+                'max': float(values.max()),
+            }
+            for q, v in zip(qs, np.percentile(values, qs)):
+                entry[f'p{q}'] = float(v)
+            entry['histogram'] = np.histogram(values, bins=bins, range=(0.0, 1.0))[0].tolist()
+            result[self.actions[code]] = entry
+        return result
+
+    def nbytes(self):
+        return self.power.nbytes + self.action.nbytes + self.time.nbytes
+
+
+if __name__ == "__main__":
+    # Memory per reading against a deque of PowerReading objects, and query cost.
+    import time
+    import tracemalloc
+    from collections import deque
+
+    from frames import PowerReading
+    from replay import synthetic_session
+
+    session = synthetic_session(duration=3600.0)
+    n = len(session)
+    start = time.time()
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    readings = deque(maxlen=n)
+    for t, action, power in session:
+        readings.append(PowerReading(float(power) + 1e-9, action, start + t))
+    deque_bytes = tracemalloc.get_traced_memory()[0] - before
+    del readings
+
+    before = tracemalloc.get_traced_memory()[0]
+    history = PowerHistory(capacity=n)
+    for t, action, power in session:
+        history.append(power, action, start + t)
+    ring_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    print(f"{n} readings (1 h at 8 Hz)")
+    print(f"deque of PowerReading: {deque_bytes / n:6.1f} bytes/reading")
+    print(f"PowerHistory:          {ring_bytes / n:6.1f} bytes/reading "
+          f"({deque_bytes / ring_bytes:.1f}x less)")
+
+    end = start + 3600.0
+    history.summary()              # warm up NumPy's percentile code path
+    for label, since in (('last 60 s', end - 60), ('last 10 min', end - 600), ('whole hour', None)):
+        t0 = time.perf_counter()
+        summary = history.summary(since=since)
+        print(f"summary over {label:<11}: {(time.perf_counter() - t0) * 1000:6.2f} ms, "
+              f"{sum(s['count'] for s in summary.values())} readings, "
+              f"left p90 {summary.get('left', {}).get('p90', 0.0):.3f}")
+
+    t0 = time.perf_counter()
+    for _ in range(1000):
+        history.append(0.5, 'left', end)
+    print(f"append: {(time.perf_counter() - t0) / 1000 * 1e6:.2f} us")
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Record / export job manager
+===========================
+Tracks Cortex records through their whole life cycle:
+
+    creating -> recording -> stopping -> processing -> ready
+             -> queued -> exporting -> exported        (or failed)
+
+`Cortex.create_record`, `stop_record` and `export_record` use fixed request
+ids, so responses cannot be told apart by id. The manager therefore keeps at
+most one create/stop request in flight and correlates everything else by
+`recordId`: the CORTEX_RECORD_POST_PROCESSING_DONE warning, and the
+success/failure lists of export responses.
+
+Exports are queued and sent with at most `max_exports` requests in flight.
+Every job exposes two `concurrent.futures.Future` objects, `processed` and
+`exported`, which can be waited on directly or awaited from asyncio with
+`asyncio.wrap_future(job.exported)`.
+
+    jobs = RecordJobManager(live.c)
+    job = jobs.start_record('subject-01 baseline')
+    ...
+    jobs.stop_record()
+    jobs.export([job], folder='/data/export', stream_types=['EEG', 'MOTION'])
+    jobs.wait_all(timeout=600)
+"""
+
+import threading
+import time
+from concurrent.futures import Future, wait
+
+from pydispatch import Dispatcher
+
+import cortex
+
+MAX_CONCURRENT_EXPORTS = 2
+
+# Job states
+CREATING = 'creating'
+RECORDING = 'recording'
+STOPPING = 'stopping'
+PROCESSING = 'processing'
+READY = 'ready'
+QUEUED = 'queued'
+EXPORTING = 'exporting'
+EXPORTED = 'exported'
+FAILED = 'failed'
+
+
+class RecordJobError(Exception):
+    """Raised from a job's futures when Cortex rejects one of its requests."""
+
+
+class RecordJob:
+    """One record and its progress through create, stop and export."""
+
+    def __init__(self, title=None, record_id=None, status=CREATING):
+        self.title = title
+        self.record_id = record_id
+        self.status = status
+        self.error = None
+        self.export_params = None
+        self.history = [(status, time.time())]
+
+        self.processed = Future()   # resolved once the record can be exported
+        self.exported = Future()    # resolved once the export succeeded
+
+    def __repr__(self):
+        return f'RecordJob(title={self.title!r}, record_id={self.record_id!r}, status={self.status!r})'
+
+    @property
+    def done(self):
+        return self.status in (EXPORTED, FAILED)
+
+    def wait(self, timeout=None):
+        """Block until the export finished; raises RecordJobError on failure."""
+        return self.exported.result(timeout)
+
+    def summary(self):
+        started = self.history[0][1]
+        return {
+            'title': self.title,
+            'recordId': self.record_id,
+            'status': self.status,
+            'error': self.error,
+            'elapsed': self.history[-1][1] - started,
+        }
+
+
+class RecordJobManager(Dispatcher):
+    """Drive many records through create -> stop -> post-processing -> export."""
+
+    _events_ = ['job_status_changed']
+
+    def __init__(self, cortex_client, max_exports=MAX_CONCURRENT_EXPORTS):
+        self.c = cortex_client
+        self.max_exports = max_exports
+
+        self.jobs = []
+        self.active = None          # job currently creating/recording/stopping
+        self.export_queue = []
+        self.exporting = {}         # record id -> job
+        self._processed_early = set()
+        self._lock = threading.RLock()
+
+        self.c.bind(create_record_done=self.on_create_record_done)
+        self.c.bind(stop_record_done=self.on_stop_record_done)
+        self.c.bind(warn_record_post_processing_done=self.on_post_processing_done)
+        self.c.bind(export_record_done=self.on_export_record_done)
+        self.c.bind(inform_error=self.on_inform_error)
+
+    # ---- Public API ----
+    def start_record(self, title, **kwargs):
+        """Create a record in the current session and return its job."""
+        if len(title) == 0:
+            raise ValueError('Empty record title.')
+        with self._lock:
+            if self.active is not None:
+                raise RuntimeError(f'Record {self.active.title!r} is still {self.active.status}.')
+            job = RecordJob(title)
+            self.jobs.append(job)
+            self.active = job
+            self.c.create_record(title, **kwargs)
+        self.emit('job_status_changed', job=job)
+        return job
+
+    def stop_record(self):
+        """Stop the active record; post-processing starts on the Cortex side."""
+        with self._lock:
+            job = self.active
+            if job is None or job.status != RECORDING:
+                raise RuntimeError('No record is being recorded.')
+            self._set_status(job, STOPPING)
+            self.c.stop_record()
+        return job
+
+    def track(self, record_id, title=None):
+        """Adopt a record created earlier (e.g. in a previous session) as ready to export."""
+        with self._lock:
+            job = self.find(record_id)
+            if job is None:
+                job = RecordJob(title, record_id, READY)
+                job.processed.set_result(job)
+                self.jobs.append(job)
+            return job
+
+    def export(self, jobs, folder, stream_types, export_format='CSV', version='V2', **kwargs):
+        """Queue jobs (or record ids) for export; returns the list of jobs."""
+        if len(folder) == 0:
+            raise ValueError('Invalid folder parameter. Please set a writable destination folder.')
+
+        params = dict(folder=folder, stream_types=stream_types, export_format=export_format,
+                      version=version, kwargs=kwargs)
+        queued = []
+        with self._lock:
+            for job in jobs:
+                if isinstance(job, str):
+                    job = self.track(job)
+                if job.status == FAILED or job.export_params is not None:
+                    continue
+                job.export_params = params
+                if job.status == READY:
+                    self._set_status(job, QUEUED)
+                    self.export_queue.append(job)
+                queued.append(job)
+            self._pump_exports()
+        return queued
+
+    def find(self, record_id):
+        with self._lock:
+            for job in self.jobs:
+                if job.record_id == record_id:
+                    return job
+        return None
+
+    def status(self):
+        """Counts per state plus a summary of every job."""
+        with self._lock:
+            counts = {}
+            for job in self.jobs:
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return {'counts': counts, 'jobs': [job.summary() for job in self.jobs]}
+
+    def wait_all(self, timeout=None):
+        """Wait for every job that has an export requested; returns (done, not_done) futures."""
+        with self._lock:
+            futures = [job.exported for job in self.jobs if job.export_params is not None]
+        return wait(futures, timeout)
+
+    # ---- Internal helpers ----
+    def _set_status(self, job, status, error=None):
+        job.status = status
+        job.history.append((status, time.time()))
+        if error is not None:
+            job.error = error
+            exc = RecordJobError(f'{job.title or job.record_id}: {error}')
+            if not job.processed.done():
+                job.processed.set_exception(exc)
+            if not job.exported.done():
+                job.exported.set_exception(exc)
+        elif status == READY and not job.processed.done():
+            job.processed.set_result(job)
+        elif status == EXPORTED and not job.exported.done():
+            job.exported.set_result(job)
+        self.emit('job_status_changed', job=job)
+
+    def _mark_processed(self, job):
+        if job.export_params is not None:
+            job.processed.set_result(job)
+            self._set_status(job, QUEUED)
+            self.export_queue.append(job)
+            self._pump_exports()
+        else:
+            self._set_status(job, READY)
+
+    def _pump_exports(self):
+        while self.export_queue and len(self.exporting) < self.max_exports:
+            job = self.export_queue.pop(0)
+            params = job.export_params
+            self.exporting[job.record_id] = job
+            self._set_status(job, EXPORTING)
+            self.c.export_record(params['folder'], params['stream_types'], params['export_format'],
+                                 [job.record_id], params['version'], **params['kwargs'])
+
+    # ---- Cortex event handlers ----
+    def on_create_record_done(self, *args, **kwargs):
+        record = kwargs.get('data')
+        with self._lock:
+            job = self.active
+            if job is None or job.status != CREATING:
+                return
+            job.record_id = record['uuid']
+            self._set_status(job, RECORDING)
+
+    def on_stop_record_done(self, *args, **kwargs):
+        record = kwargs.get('data')
+        with self._lock:
+            job = self.find(record['uuid']) or self.active
+            if job is None:
+                return
+            if job is self.active:
+                self.active = None
+            if job.record_id in self._processed_early:
+                self._processed_early.discard(job.record_id)
+                self._mark_processed(job)
+            else:
+                self._set_status(job, PROCESSING)
+
+    def on_post_processing_done(self, *args, **kwargs):
+        record_id = kwargs.get('data')
+        with self._lock:
+            job = self.find(record_id)
+            if job is None or job.status in (CREATING, RECORDING, STOPPING):
+                # the warning overtook the stopRecord response
+                self._processed_early.add(record_id)
+                return
+            if job.status == PROCESSING:
+                self._mark_processed(job)
+
+    def on_export_record_done(self, *args, **kwargs):
+        success = kwargs.get('data') or []
+        failure = kwargs.get('failure') or []
+        with self._lock:
+            for record_id in success:
+                job = self.exporting.pop(record_id, None)
+                if job is not None:
+                    self._set_status(job, EXPORTED)
+            for record in failure:
+                job = self.exporting.pop(record['recordId'], None)
+                if job is not None:
+                    self._set_status(job, FAILED, error=record.get('message', 'export failed'))
+            self._pump_exports()
+
+    def on_inform_error(self, *args, **kwargs):
+        request_id = kwargs.get('request_id')
+        message = (kwargs.get('error_data') or {}).get('message', 'request failed')
+        with self._lock:
+            if request_id in (cortex.CREATE_RECORD_REQUEST_ID, cortex.STOP_RECORD_REQUEST_ID):
+                job = self.active
+                if job is not None:
+                    self.active = None
+                    self._set_status(job, FAILED, error=message)
+            elif request_id == cortex.EXPORT_RECORD_ID:
+                # An error response carries no record ids, so every in-flight export is failed
+                for job in list(self.exporting.values()):
+                    self._set_status(job, FAILED, error=message)
+                self.exporting.clear()
+                self._pump_exports()
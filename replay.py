@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Mental-command session recording and replay
+===========================================
+A session is a list of `(t, action, power)` tuples, `t` in seconds from the
+first frame. Sessions let cursor control be tuned and benchmarked without a
+headset:
+
+    recorder = ComRecorder('session.jsonl')
+    live.subscriptions.bind(new_com_data=recorder.on_new_com_data)
+    ...
+    session = load_session('session.jsonl')      # or synthetic_session(60)
+    replay(session, handler, speed=None)          # None = as fast as possible
+
+Recorded files are JSON lines: {"time": ..., "action": ..., "power": ...}.
+"""
+
+import json
+import random
+import threading
+import time
+
+COM_RATE = 8    # com frames per second sent by Cortex
+
+# (action, weight, typical power) for synthetic sessions
+SYNTHETIC_ACTIONS = (
+    ('neutral', 4, 0.0),
+    ('left', 2, 0.6),
+    ('right', 2, 0.6),
+    ('push', 1, 0.55),
+    ('pull', 1, 0.55),
+    ('lift', 1, 0.5),
+    ('drop', 1, 0.5),
+)
+
+
+class ComRecorder:
+    """Appends every `new_com_data` frame to a JSON lines file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.frames = 0
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', buffering=1)  # line buffered: survives a hard exit
+
+    def on_new_com_data(self, *args, **kwargs):
+        data = kwargs.get('data', {}) or {}
+        line = json.dumps({'time': data.get('time'), 'action': data.get('action'),
+                           'power': data.get('power', 0.0)})
+        with self._lock:
+            self._file.write(line + '\n')
+            self.frames += 1
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def load_session(path):
+    """Read a recorded session; times are made relative to the first frame."""
+    session = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            frame = json.loads(line)
+            session.append((float(frame['time']), frame['action'], float(frame.get('power') or 0.0)))
+    if session:
+        start = session[0][0]
+        session = [(t - start, action, power) for t, action, power in session]
+    return session
+
+
+def synthetic_session(duration=60.0, rate=COM_RATE, seed=0, actions=SYNTHETIC_ACTIONS):
+    """Plausible com stream: actions held for 0.5-3 s with noisy power."""
+    rng = random.Random(seed)
+    names = [a[0] for a in actions]
+    weights = [a[1] for a in actions]
+    typical = {a[0]: a[2] for a in actions}
+    session = []
+    t = 0.0
+    while t < duration:
+        action = rng.choices(names, weights)[0]
+        hold_until = min(t + rng.uniform(0.5, 3.0), duration)
+        while t < hold_until:
+            base = typical[action]
+            power = 0.0 if action == 'neutral' else min(1.0, max(0.0, rng.gauss(base, 0.15)))
+            session.append((round(t, 4), action, round(power, 3)))
+            t += 1.0 / rate + rng.uniform(-0.02, 0.02)
+    return session
+
+
+def replay(session, callback, speed=1.0, stop=None):
+    """Call `callback(action, power, t)` for each frame at its recorded time.
+
+    `speed` scales playback (2.0 = twice as fast); None replays without
+    waiting. `stop` is an optional zero-argument callable checked per frame.
+    """
+    start = time.perf_counter()
+    for t, action, power in session:
+        if stop is not None and stop():
+            break
+        if speed:
+            delay = start + t / speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        callback(action, power, t)
+    return len(session)
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Screen geometry
+===============
+Knows the monitor layout so cursor targets can be clamped (or wrapped) in
+memory instead of leaving off-screen moves to the OS, and so `size()` does
+not cost a display round trip.
+
+Monitors are enumerated once, from the first source that works:
+
+1. `screeninfo` (all platforms, optional dependency)
+2. XRandR through an `XlibBackend`'s display connection (also when it is
+   wrapped, e.g. in an `OutputStage`)
+3. the backend's `size()` as a single monitor
+
+With only the third source the real layout is unknown (`size()` may cover
+just the primary monitor), so `clamp()` and `wrap()` leave positions alone
+and the OS keeps the cursor on screen. The layout is cached. `refresh()` re-enumerates and tells listeners when it
+changed; `watch()` does that periodically on a background thread.
+
+Each monitor can carry a speed scale (e.g. slower on a small high-DPI
+laptop panel), looked up by monitor name or index:
+
+    screen = ScreenGeometry(backend, speed_scale={'eDP-1': 0.6})
+    x, y = screen.clamp(x, y)
+    factor = screen.scale_at(x, y)
+"""
+
+import threading
+
+try:
+    import screeninfo
+except ImportError:
+    screeninfo = None
+
+REFRESH_INTERVAL = 5.0   # seconds between layout checks in watch()
+
+
+class Monitor:
+    """One monitor's rectangle in virtual-desktop coordinates."""
+
+    __slots__ = ('x', 'y', 'width', 'height', 'name', 'primary', 'scale', 'right', 'bottom')
+
+    def __init__(self, x, y, width, height, name=None, primary=False, scale=1.0):
+        self.x = int(x)
+        self.y = int(y)
+        self.width = int(width)
+        self.height = int(height)
+        self.name = name
+        self.primary = primary
+        self.scale = scale
+        self.right = self.x + self.width - 1
+        self.bottom = self.y + self.height - 1
+
+    def contains(self, x, y):
+        return self.x <= x <= self.right and self.y <= y <= self.bottom
+
+    def clamp(self, x, y):
+        return (min(max(x, self.x), self.right), min(max(y, self.y), self.bottom))
+
+    def distance2(self, x, y):
+        """Squared distance from (x, y) to the nearest point of this monitor."""
+        cx, cy = self.clamp(x, y)
+        return (cx - x) ** 2 + (cy - y) ** 2
+
+    def layout(self):
+        return (self.x, self.y, self.width, self.height, self.name, self.primary)
+
+    def __repr__(self):
+        return (f"Monitor({self.name!r}, {self.width}x{self.height}+{self.x}+{self.y}"
+                f"{', primary' if self.primary else ''}, scale={self.scale})")
+
+
+def _from_screeninfo():
+    return [Monitor(m.x, m.y, m.width, m.height, m.name, bool(getattr(m, 'is_primary', False)))
+            for m in screeninfo.get_monitors()]
+
+
+def _from_xrandr(backend):
+    display = backend.display
+    if not display.has_extension('RANDR'):
+        return []
+    reply = backend.root.xrandr_get_monitors(is_active=True)
+    return [Monitor(m.x, m.y, m.width_in_pixels, m.height_in_pixels,
+                    display.get_atom_name(m.name), bool(m.primary))
+            for m in reply.monitors]
+
+
+def base_backend(backend):
+    """The real backend below any wrappers (OutputStage, CursorState) around it."""
+    while getattr(backend, 'backend', None) is not None:
+        backend = backend.backend
+    return backend
+
+
+def enumerate_monitors(backend=None, fallback=True):
+    """Monitor list from the first source that works (see module docstring).
+
+    With `fallback=False`, an empty list instead of the backend's size.
+    """
+    if screeninfo is not None:
+        try:
+            monitors = _from_screeninfo()
+            if monitors:
+                return monitors
+        except Exception:
+            pass
+    base = base_backend(backend)
+    if base is not None and getattr(base, 'name', '') == 'xlib':
+        try:
+            monitors = _from_xrandr(base)
+            if monitors:
+                return monitors
+        except Exception:
+            pass
+    if not fallback:
+        return []
+    if backend is None:
+        raise RuntimeError('No monitor source: install screeninfo or pass a cursor backend')
+    width, height = backend.size()
+    return [Monitor(0, 0, width, height, 'screen', True)]
+
+
+class ScreenGeometry:
+    """Cached monitor layout with in-memory clamping, wrapping and lookups."""
+
+    def __init__(self, backend=None, monitors=None, speed_scale=None):
+        self.backend = backend
+        self.speed_scale = dict(speed_scale or {})
+        self.version = 0
+        self.refreshes = 0
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._fixed = monitors is not None
+        self.known = True        # False while only the backend's size is known
+        self._install(monitors if monitors is not None else self._enumerate())
+
+    def _enumerate(self):
+        monitors = enumerate_monitors(self.backend, fallback=False)
+        self.known = bool(monitors)
+        return monitors or enumerate_monitors(self.backend)
+
+    def _install(self, monitors):
+        for index, monitor in enumerate(monitors):
+            monitor.scale = self.speed_scale.get(monitor.name, self.speed_scale.get(index, monitor.scale))
+        monitors = tuple(monitors)
+        left = min(m.x for m in monitors)
+        top = min(m.y for m in monitors)
+        right = max(m.right for m in monitors)
+        bottom = max(m.bottom for m in monitors)
+        # Swap everything at once; readers never see a half-updated layout
+        self._layout = (monitors, (left, top, right, bottom))
+        self._hint = monitors[0]
+        self.version += 1
+
+    # ---- Layout ----
+    @property
+    def monitors(self):
+        return self._layout[0]
+
+    @property
+    def bounds(self):
+        """(left, top, right, bottom) of the whole virtual desktop, inclusive."""
+        return self._layout[1]
+
+    @property
+    def primary(self):
+        for monitor in self.monitors:
+            if monitor.primary:
+                return monitor
+        return self.monitors[0]
+
+    def size(self):
+        left, top, right, bottom = self.bounds
+        return right - left + 1, bottom - top + 1
+
+    def refresh(self):
+        """Re-enumerate monitors; True (and listeners called) if the layout changed."""
+        if self._fixed:
+            return False
+        monitors = self._enumerate()
+        with self._lock:
+            self.refreshes += 1
+            if [m.layout() for m in monitors] == [m.layout() for m in self.monitors]:
+                return False
+            self._install(monitors)
+        print(f"[Screen] Layout changed: {list(self.monitors)}")
+        for callback in self._callbacks:
+            callback(self)
+        return True
+
+    def on_change(self, callback):
+        """Call `callback(screen)` after the layout changes."""
+        self._callbacks.append(callback)
+        return callback
+
+    def watch(self, interval=REFRESH_INTERVAL):
+        if self._fixed or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch_loop, args=(interval,),
+                                        name='ScreenGeometry', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _watch_loop(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"[Screen] Refresh failed: {e}")
+
+    # ---- Queries ----
+    def monitor_at(self, x, y):
+        """Monitor containing (x, y), or the nearest one if it is off-screen."""
+        hint = self._hint
+        if hint.contains(x, y):
+            return hint
+        monitors = self._layout[0]
+        for monitor in monitors:
+            if monitor.contains(x, y):
+                self._hint = monitor
+                return monitor
+        return min(monitors, key=lambda m: m.distance2(x, y))
+
+    def clamp(self, x, y):
+        """Nearest on-screen position; also handles gaps between monitors."""
+        x, y = int(round(x)), int(round(y))
+        if not self.known:
+            return x, y
+        return self.monitor_at(x, y).clamp(x, y)
+
+    def wrap(self, x, y):
+        """Wrap around the desktop edges (torus), then clamp into a monitor."""
+        if not self.known:
+            return int(round(x)), int(round(y))
+        left, top, right, bottom = self._layout[1]
+        x = left + (int(round(x)) - left) % (right - left + 1)
+        y = top + (int(round(y)) - top) % (bottom - top + 1)
+        return self.monitor_at(x, y).clamp(x, y)
+
+    def scale_at(self, x, y):
+        """Speed scale of the monitor under (x, y)."""
+        return self.monitor_at(x, y).scale
+
+
+if __name__ == "__main__":
+    import time
+
+    from backends import VirtualBackend
+
+    try:
+        screen = ScreenGeometry(None)
+        print(f"Detected: {list(screen.monitors)}")
+    except RuntimeError as e:
+        print(f"Detection unavailable ({e}); using a virtual backend")
+        screen = ScreenGeometry(VirtualBackend())
+
+    # Cost of an in-memory clamp on a 3-monitor layout vs a backend size query.
+    layout = ScreenGeometry(monitors=[Monitor(0, 0, 1920, 1080, 'left', True),
+                                      Monitor(1920, -200, 2560, 1440, 'middle'),
+                                      Monitor(4480, 0, 1080, 1920, 'right')],
+                            speed_scale={'middle': 1.5})
+    n = 100000
+    start = time.perf_counter()
+    for i in range(n):
+        layout.clamp(i % 7000 - 500, (i * 7) % 2400 - 300)
+    print(f"clamp: {(time.perf_counter() - start) / n * 1e6:.2f} us/call")
+    print(layout.clamp(3000, -500), layout.clamp(5000, 1800), layout.wrap(-10, 50),
+          layout.scale_at(3000, 100))
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Process-wide stop signal
+========================
+One kill switch shared by every control loop, instead of a `keyboard.wait`
+thread per event. Sources are installed once by `start()`:
+
+- ESC, through a `keyboard` hotkey (no extra thread per caller)
+- SIGINT (Ctrl+C), chained to the previous handler so the program still exits
+- an HTTP stop endpoint: a tiny standalone server on `http_port`, and/or a
+  `/stop` route on an existing Flask app via `register_route(app)`
+
+Loops poll the cheap `stop_signal.is_stopped()` or block in `wait()`;
+components that own threads register `on_stop(callback)`:
+
+    from stop_signal import stop_signal
+    stop_signal.start()
+    while not stop_signal.is_stopped():
+        ...
+"""
+
+import signal
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STOP_KEY = 'esc'
+STOP_HTTP_HOST = '127.0.0.1'
+STOP_HTTP_PATH = '/stop'
+
+
+class StopSignal:
+    """Thread-safe, idempotent stop flag with callbacks."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+        self._sources = set()
+        self._previous_sigint = None
+        self._http_server = None
+        self.reason = None
+
+    # ---- Queries ----
+    def is_stopped(self):
+        return self._event.is_set()
+
+    def wait(self, timeout=None):
+        """Block until stopped or `timeout` seconds pass; True if stopped."""
+        return self._event.wait(timeout)
+
+    # ---- Control ----
+    def stop(self, reason='manual'):
+        """Raise the stop signal; callbacks run once, on the calling thread."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks = list(self._callbacks)
+        print(f"\n⛔ Stop requested ({reason})")
+        for callback in callbacks:
+            try:
+                callback(reason)
+            except Exception as e:
+                print(f"[Stop] Callback {callback!r} failed: {e}")
+
+    def reset(self):
+        """Clear the signal so control can be started again."""
+        with self._lock:
+            self._event.clear()
+            self.reason = None
+
+    def on_stop(self, callback):
+        """Call `callback(reason)` on stop; immediately if already stopped."""
+        with self._lock:
+            if callback not in self._callbacks:
+                self._callbacks.append(callback)
+            stopped = self._event.is_set()
+        if stopped:
+            callback(self.reason)
+        return callback
+
+    def remove_callback(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    # ---- Sources ----
+    def start(self, key=STOP_KEY, sigint=True, http_port=None):
+        """Install the stop sources; calling it again adds only missing ones."""
+        with self._lock:
+            wanted = {'key': bool(key), 'sigint': sigint, 'http': http_port is not None}
+            todo = [name for name, on in wanted.items() if on and name not in self._sources]
+            self._sources.update(todo)
+        if 'key' in todo:
+            self._install_hotkey(key)
+        if 'sigint' in todo:
+            self._install_sigint()
+        if 'http' in todo:
+            self._serve_http(http_port)
+        return self
+
+    def _install_hotkey(self, key):
+        try:
+            import keyboard
+            keyboard.add_hotkey(key, self.stop, args=(key,))
+            print(f"Press {key.upper()} to stop cursor control at any time...")
+        except ImportError:
+            print("Note: 'keyboard' library not available. Use Ctrl+C to interrupt.")
+        except Exception as e:
+            print(f"Keyboard monitoring error: {e}")
+
+    def _install_sigint(self):
+        if threading.current_thread() is not threading.main_thread():
+            # signal handlers can only be installed from the main thread
+            with self._lock:
+                self._sources.discard('sigint')
+            return
+        self._previous_sigint = signal.getsignal(signal.SIGINT)
+        signal.signal(signal.SIGINT, self._on_sigint)
+
+    def _on_sigint(self, signum, frame):
+        self.stop('SIGINT')
+        previous = self._previous_sigint
+        if callable(previous):
+            previous(signum, frame)
+
+    def _serve_http(self, port):
+        stop_signal = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _reply(self):
+                if self.path.rstrip('/') != STOP_HTTP_PATH:
+                    self.send_error(404)
+                    return
+                stop_signal.stop('HTTP')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain')
+                self.end_headers()
+                self.wfile.write(b'stopped\n')
+
+            do_GET = do_POST = _reply
+
+            def log_message(self, *args):
+                pass
+
+        self._http_server = ThreadingHTTPServer((STOP_HTTP_HOST, port), Handler)
+        self._http_server.daemon_threads = True
+        threading.Thread(target=self._http_server.serve_forever, name='StopSignalHTTP',
+                         daemon=True).start()
+        print(f"Stop endpoint: http://{STOP_HTTP_HOST}:{self._http_server.server_port}{STOP_HTTP_PATH}")
+
+    def register_route(self, app, rule=STOP_HTTP_PATH):
+        """Add a stop route to a Flask app."""
+        def stop_view():
+            self.stop('HTTP')
+            return {'stopped': True, 'reason': self.reason}
+
+        app.add_url_rule(rule, 'stop_signal', stop_view, methods=['GET', 'POST'])
+
+
+# The shared instance used across the project
+stop_signal = StopSignal()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Listener-aware stream subscriptions
+===================================
+Keeps the set of subscribed Cortex data streams equal to the set of streams
+that somebody actually listens to.
+
+Bind stream handlers through `SubscriptionManager.bind` instead of
+`Cortex.bind`. Once the session is ready (`activate()`), the manager sends
+`sub_request`/`unsub_request` as listeners come and go. Changes are debounced
+so a burst of bind/unbind calls becomes a single request, and the local view
+is reconciled against the success/failure lists of the SUB_REQUEST_ID and
+UNSUB_REQUEST_ID responses.
+"""
+
+import threading
+
+# Delay (seconds) used to batch bind/unbind bursts into one request
+SUBSCRIBE_DEBOUNCE = 0.2
+
+# Cortex stream event -> Cortex stream name
+STREAM_EVENTS = {
+    'new_com_data': 'com',
+    'new_fe_data': 'fac',
+    'new_eeg_data': 'eeg',
+    'new_mot_data': 'mot',
+    'new_dev_data': 'dev',
+    'new_met_data': 'met',
+    'new_pow_data': 'pow',
+    'new_sys_data': 'sys',
+}
+
+
+class SubscriptionManager:
+    """Subscribe only to the streams that have at least one bound listener."""
+
+    def __init__(self, cortex, debounce=SUBSCRIBE_DEBOUNCE):
+        self.c = cortex
+        self.debounce = debounce
+
+        self.listeners = {}         # stream name -> list of callbacks
+        self.subscribed = set()     # confirmed by Cortex
+        self.pending_sub = set()    # requested, waiting for the response
+        self.pending_unsub = set()
+        self.failures = {}          # stream name -> failure message
+        self.active = False
+
+        self._lock = threading.RLock()
+        self._timer = None
+
+        self.c.bind(sub_request_done=self.on_sub_request_done)
+        self.c.bind(unsub_request_done=self.on_unsub_request_done)
+        self.c.bind(warn_cortex_stop_all_sub=self.on_stop_all_sub)
+
+    # ---- Listener tracking ----
+    def bind(self, **kwargs):
+        """Bind stream handlers, e.g. `bind(new_com_data=self.on_new_com_data)`."""
+        with self._lock:
+            for event, callback in kwargs.items():
+                stream = self._stream_for(event)
+                self.c.bind(**{event: callback})
+                callbacks = self.listeners.setdefault(stream, [])
+                if not callbacks:
+                    # A new consumer gets a fresh chance after an earlier failure
+                    self.failures.pop(stream, None)
+                callbacks.append(callback)
+            self._schedule()
+
+    def unbind(self, **kwargs):
+        """Unbind stream handlers, e.g. `unbind(new_pow_data=self.on_new_pow_data)`."""
+        with self._lock:
+            for event, callback in kwargs.items():
+                stream = self._stream_for(event)
+                self.c.get_dispatcher_event(event).remove_listener(callback)
+                callbacks = self.listeners.get(stream, [])
+                if callback in callbacks:
+                    callbacks.remove(callback)
+            self._schedule()
+
+    def wanted_streams(self):
+        """Streams with at least one listener."""
+        with self._lock:
+            return {stream for stream, callbacks in self.listeners.items() if callbacks}
+
+    # ---- Session lifecycle ----
+    def activate(self):
+        """Start subscribing; call once the session and profile are ready."""
+        with self._lock:
+            self.active = True
+        self.reconcile()
+
+    def deactivate(self):
+        """Stop sending requests (e.g. when the session closes)."""
+        with self._lock:
+            self.active = False
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    # ---- Reconciliation ----
+    def _stream_for(self, event):
+        try:
+            return STREAM_EVENTS[event]
+        except KeyError:
+            raise ValueError(f'{event} is not a Cortex stream event') from None
+
+    def _schedule(self):
+        if not self.active:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.debounce, self.reconcile)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def reconcile(self):
+        """Send the requests needed to match subscriptions to listeners."""
+        with self._lock:
+            self._timer = None
+            if not self.active:
+                return
+
+            wanted = self.wanted_streams()
+            to_sub = wanted - self.subscribed - self.pending_sub - set(self.failures)
+            to_unsub = self.subscribed - wanted - self.pending_unsub
+
+            if to_sub:
+                self.pending_sub |= to_sub
+                self.c.sub_request(sorted(to_sub))
+            if to_unsub:
+                self.pending_unsub |= to_unsub
+                self.c.unsub_request(sorted(to_unsub))
+
+    def _needs_reconcile(self):
+        wanted = self.wanted_streams()
+        missing = wanted - self.subscribed - self.pending_sub - set(self.failures)
+        extra = self.subscribed - wanted - self.pending_unsub
+        return bool(missing or extra)
+
+    # ---- Cortex event handlers ----
+    def on_sub_request_done(self, *args, **kwargs):
+        data = kwargs.get('data') or {}
+        with self._lock:
+            for stream in data.get('success', []):
+                name = stream['streamName']
+                self.subscribed.add(name)
+                self.pending_sub.discard(name)
+                self.failures.pop(name, None)
+            for stream in data.get('failure', []):
+                name = stream['streamName']
+                self.pending_sub.discard(name)
+                self.failures[name] = stream.get('message', '')
+            # Listeners may have changed while the request was in flight
+            if self._needs_reconcile():
+                self._schedule()
+
+    def on_unsub_request_done(self, *args, **kwargs):
+        data = kwargs.get('data') or {}
+        with self._lock:
+            for stream in data.get('success', []):
+                name = stream['streamName']
+                self.subscribed.discard(name)
+                self.pending_unsub.discard(name)
+            for stream in data.get('failure', []):
+                # Nothing left to retry; typically the stream was not subscribed
+                name = stream['streamName']
+                self.subscribed.discard(name)
+                self.pending_unsub.discard(name)
+            if self._needs_reconcile():
+                self._schedule()
+
+    def on_stop_all_sub(self, *args, **kwargs):
+        # Cortex dropped every stream together with the session
+        with self._lock:
+            self.subscribed.clear()
+            self.pending_sub.clear()
+            self.pending_unsub.clear()
+        self.deactivate()
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Adaptive per-action power thresholds
+====================================
+Mental-command power distributions differ between users and between actions,
+so a fixed `power > 0.5` is too strict for some and too loose for others.
+`AdaptiveThresholds` keeps streaming quantile estimates of the power of each
+action and derives two levels from them:
+
+- `threshold(action)`: the trigger level (TRIGGER_QUANTILE of that action's
+  power), used instead of ACTION_THRESHOLD;
+- `medium(action)`: a lower level (MEDIUM_QUANTILE) for feedback displays,
+  used instead of POWER_THRESHOLD.
+
+Quantiles are tracked with the P² algorithm (Jain & Chlamtac, 1985): five
+markers per quantile, O(1) memory, and an update that only mutates
+preallocated lists, so it can run on every `com` frame. Until an action has
+`calibration_frames` samples its thresholds stay at the defaults; then its
+levels are frozen, so they cannot drift towards whatever the user happens to
+do later. `start_calibration()` learns them again.
+
+The trigger never drops below a noise floor: NOISE_QUANTILE of the power
+seen on `neutral` frames (zero-power ones included) plus NOISE_MARGIN, and
+never below `minimum`, so a calibration done with weak, noisy commands
+cannot make noise trigger.
+
+Estimates are saved per profile name and restored on the next start, so
+calibration only has to happen once:
+
+    thresholds = AdaptiveThresholds('my-profile')
+    thresholds.update(action, power)           # every com frame
+    if power > thresholds.threshold(action):
+        ...
+    thresholds.save()
+"""
+
+import json
+import os
+import re
+import tempfile
+import threading
+
+TRIGGER_QUANTILE = 0.6    # power quantile an action must exceed to trigger
+MEDIUM_QUANTILE = 0.3     # lower level for feedback displays
+DEFAULT_THRESHOLD = 0.5   # trigger level while calibrating
+DEFAULT_MEDIUM = 0.3
+MIN_THRESHOLD = 0.15      # adaptive levels are clamped into this range
+MAX_THRESHOLD = 0.9
+NOISE_QUANTILE = 0.9      # neutral power quantile taken as the noise level
+NOISE_MARGIN = 0.05       # triggers stay at least this far above the noise level
+CALIBRATION_FRAMES = 80   # samples per action before adapting (10 s of com at 8 Hz)
+THRESHOLDS_DIR = os.getenv('THRESHOLDS_DIR',
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), 'thresholds'))
+
+
+class P2Quantile:
+    """Streaming estimate of the p-quantile in constant memory (P² algorithm)."""
+
+    __slots__ = ('p', 'n', 'q', 'pos', 'desired', 'inc')
+
+    def __init__(self, p):
+        if not 0 < p < 1:
+            raise ValueError(f'quantile must be between 0 and 1, not {p}')
+        self.p = p
+        self.n = 0
+        self.q = [0.0] * 5                       # marker heights
+        self.pos = [1.0, 2.0, 3.0, 4.0, 5.0]     # marker positions
+        self.desired = [1.0, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5.0]
+        self.inc = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def update(self, x):
+        q = self.q
+        n = self.n
+        self.n = n + 1
+        if n < 5:
+            q[n] = x
+            if n == 4:
+                q.sort()
+            return
+
+        pos = self.pos
+        desired = self.desired
+        inc = self.inc
+        # find the cell k with q[k] <= x < q[k + 1], extending the extremes
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+        i = k + 1
+        while i < 5:
+            pos[i] += 1.0
+            i += 1
+        desired[1] += inc[1]
+        desired[2] += inc[2]
+        desired[3] += inc[3]
+        desired[4] += 1.0
+
+        # nudge the three middle markers towards their desired positions
+        i = 1
+        while i < 4:
+            d = desired[i] - pos[i]
+            if (d >= 1.0 and pos[i + 1] - pos[i] > 1.0) or (d <= -1.0 and pos[i - 1] - pos[i] < -1.0):
+                s = 1.0 if d > 0 else -1.0
+                candidate = q[i] + s / (pos[i + 1] - pos[i - 1]) * (
+                    (pos[i] - pos[i - 1] + s) * (q[i + 1] - q[i]) / (pos[i + 1] - pos[i])
+                    + (pos[i + 1] - pos[i] - s) * (q[i] - q[i - 1]) / (pos[i] - pos[i - 1]))
+                if q[i - 1] < candidate < q[i + 1]:
+                    q[i] = candidate
+                else:
+                    j = i + 1 if s > 0 else i - 1
+                    q[i] += s * (q[j] - q[i]) / (pos[j] - pos[i])
+                pos[i] += s
+            i += 1
+
+    def value(self):
+        """Current estimate (None before the first sample)."""
+        n = self.n
+        if n >= 5:
+            return self.q[2]
+        if n == 0:
+            return None
+        # warm-up: exact quantile of the few samples seen so far
+        samples = sorted(self.q[:n])
+        return samples[min(int(self.p * n), n - 1)]
+
+    def state(self):
+        return {'p': self.p, 'n': self.n, 'q': list(self.q), 'pos': list(self.pos),
+                'desired': list(self.desired)}
+
+    @classmethod
+    def from_state(cls, state):
+        estimator = cls(state['p'])
+        estimator.n = state['n']
+        estimator.q[:] = state['q']
+        estimator.pos[:] = state['pos']
+        estimator.desired[:] = state['desired']
+        return estimator
+
+
+class ActionLevels:
+    """Quantile estimators and current levels for one action."""
+
+    __slots__ = ('trigger', 'medium', 'count', 'threshold', 'medium_level')
+
+    def __init__(self, trigger_q, medium_q, threshold, medium_level):
+        self.trigger = P2Quantile(trigger_q)
+        self.medium = P2Quantile(medium_q)
+        self.count = 0
+        self.threshold = threshold
+        self.medium_level = medium_level
+
+
+class AdaptiveThresholds:
+    """Per-action trigger levels learned from com power, persisted per profile."""
+
+    def __init__(self, profile, trigger_quantile=TRIGGER_QUANTILE, medium_quantile=MEDIUM_QUANTILE,
+                 calibration_frames=CALIBRATION_FRAMES, default=DEFAULT_THRESHOLD,
+                 default_medium=DEFAULT_MEDIUM, minimum=MIN_THRESHOLD, maximum=MAX_THRESHOLD,
+                 directory=THRESHOLDS_DIR, ignore=('neutral',)):
+        if calibration_frames < 1:
+            raise ValueError(f'calibration_frames must be at least 1, not {calibration_frames}')
+        self.profile = profile
+        self.trigger_quantile = trigger_quantile
+        self.medium_quantile = medium_quantile
+        self.calibration_frames = calibration_frames
+        self.default = default
+        self.default_medium = default_medium
+        self.minimum = minimum
+        self.maximum = maximum
+        self.directory = directory
+        self.ignore = frozenset(ignore)
+        self.actions = {}
+        self.noise = P2Quantile(NOISE_QUANTILE)   # power on ignored (neutral) frames
+        self.floor = minimum                      # lowest trigger level allowed
+        self._save_lock = threading.Lock()
+        self._save_pending = False
+        if os.path.exists(self.path):
+            self.load()
+
+    @property
+    def path(self):
+        safe = re.sub(r'[^A-Za-z0-9_.-]+', '_', self.profile or 'default')
+        return os.path.join(self.directory, safe + '.json')
+
+    # ---- Hot path ----
+    def update(self, action, power):
+        """Feed one com frame; O(1) and allocation-free once the action is known."""
+        if action is None:
+            return
+        if action in self.ignore:
+            # Cortex reports most neutral frames at 0.0; they are noise samples too
+            self.noise.update(max(power, 0.0))
+            self._update_floor()
+            return
+        if power <= 0.0:
+            return
+        levels = self.actions.get(action)
+        if levels is None:
+            levels = self.actions[action] = ActionLevels(
+                self.trigger_quantile, self.medium_quantile, self.default, self.default_medium)
+        elif levels.count >= self.calibration_frames:
+            return      # calibrated: levels are frozen
+        levels.trigger.update(power)
+        levels.medium.update(power)
+        levels.count += 1
+        if levels.count == self.calibration_frames:
+            self._freeze(levels)
+            print(f"\n[Thresholds] {action!r} calibrated: trigger {levels.threshold:.3f}, "
+                  f"medium {levels.medium_level:.3f}")
+            self.save_async()
+
+    def _freeze(self, levels):
+        # value() is exact while an estimator has fewer than 5 samples
+        levels.threshold = min(max(levels.trigger.value(), self.minimum), self.maximum)
+        levels.medium_level = min(max(levels.medium.value(), self.minimum), levels.threshold)
+
+    def _update_floor(self):
+        self.floor = min(max(self.noise.value() + NOISE_MARGIN, self.minimum), self.maximum)
+
+    def threshold(self, action):
+        levels = self.actions.get(action)
+        if levels is None:
+            return max(self.default, self.floor)
+        return max(levels.threshold, self.floor)
+
+    def medium(self, action):
+        levels = self.actions.get(action)
+        return self.default_medium if levels is None else levels.medium_level
+
+    def calibrated(self, action):
+        levels = self.actions.get(action)
+        return levels is not None and levels.count >= self.calibration_frames
+
+    # ---- Calibration ----
+    def start_calibration(self, actions=None):
+        """Forget learned levels (for `actions`, or all) and calibrate again."""
+        for action in list(actions or self.actions):
+            self.actions.pop(action, None)
+
+    def summary(self):
+        return {action: {'threshold': round(self.threshold(action), 4),
+                         'medium': round(levels.medium_level, 4),
+                         'samples': levels.count,
+                         'calibrated': levels.count >= self.calibration_frames}
+                for action, levels in self.actions.items()}
+
+    # ---- Persistence ----
+    def save(self):
+        # One save at a time, each through its own temp file: a background save
+        # overlapping the one on stop can never publish a mixed file.
+        with self._save_lock:
+            self._save_pending = False
+            state = {action: {'count': levels.count,
+                              'trigger': levels.trigger.state(),
+                              'medium': levels.medium.state()}
+                     for action, levels in list(self.actions.items())}
+            os.makedirs(self.directory, exist_ok=True)
+            with tempfile.NamedTemporaryFile('w', dir=self.directory, suffix='.tmp',
+                                             delete=False) as f:
+                json.dump({'profile': self.profile, 'actions': state,
+                           'noise': self.noise.state()}, f, indent=2)
+            try:
+                os.replace(f.name, self.path)
+            except OSError:
+                os.unlink(f.name)
+                raise
+
+    def save_async(self):
+        """Save on a helper thread so the com handler never waits on disk."""
+        if self._save_pending:
+            return
+        self._save_pending = True
+        threading.Thread(target=self.save, name='ThresholdsSave', daemon=True).start()
+
+    def load(self):
+        with open(self.path) as f:
+            state = json.load(f)
+        if 'noise' in state:
+            self.noise = P2Quantile.from_state(state['noise'])
+            if self.noise.n:
+                self._update_floor()
+        for action, saved in state.get('actions', {}).items():
+            levels = ActionLevels(self.trigger_quantile, self.medium_quantile,
+                                  self.default, self.default_medium)
+            levels.trigger = P2Quantile.from_state(saved['trigger'])
+            levels.medium = P2Quantile.from_state(saved['medium'])
+            levels.count = saved['count']
+            if levels.count >= self.calibration_frames:
+                if levels.trigger.n:
+                    self._freeze(levels)
+                else:
+                    # count without samples: a broken file, so calibrate this action again
+                    levels.count = 0
+            self.actions[action] = levels
+        print(f"[Thresholds] Loaded {len(self.actions)} action(s) for profile {self.profile!r}")
+
+
+if __name__ == "__main__":
+    # Accuracy against exact quantiles and per-update cost.
+    import random
+    import time
+
+    import numpy as np
+
+    rng = random.Random(0)
+    for name, draw in (('beta(2,5)', lambda: rng.betavariate(2, 5)),
+                       ('beta(5,2)', lambda: rng.betavariate(5, 2)),
+                       ('uniform', rng.random)):
+        data = [draw() for _ in range(20000)]
+        for p in (0.3, 0.6, 0.9):
+            estimator = P2Quantile(p)
+            for x in data:
+                estimator.update(x)
+            exact = float(np.quantile(data, p))
+            print(f"{name:<10} p={p}: P2 {estimator.value():.4f}  exact {exact:.4f}  "
+                  f"error {abs(estimator.value() - exact):.4f}")
+
+    # calibration long enough that every update below runs the estimators
+    actions = ['left', 'right', 'push', 'pull'] * 25000
+    powers = [rng.random() for _ in actions]
+    thresholds = AdaptiveThresholds('benchmark', directory=tempfile.mkdtemp(),
+                                    calibration_frames=len(actions))
+    start = time.perf_counter()
+    for action, power in zip(actions, powers):
+        thresholds.update(action, power)
+    print(f"update: {(time.perf_counter() - start) / len(actions) * 1e6:.2f} us/frame")
+
+    # Steady state holds no new memory: the per-action state is fixed size.
+    import tracemalloc
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for action, power in zip(actions, powers):
+        thresholds.update(action, power)
+    print(f"memory retained by {len(actions)} updates: {tracemalloc.get_traced_memory()[0] - before} bytes")
+    tracemalloc.stop()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Precomputed trajectories and deadline playback
+==============================================
+Plays a cursor path computed up front (a NumPy array with one row per frame,
+already rounded to pixels; see patterns.py) against absolute deadlines:
+
+    path = patterns.path('circle', (640, 360), duration=5.0, fps=60, radius=100)
+    stats = play(path, cursor.move_to, fps=60)
+
+Frame i is due at start + i / fps, so time spent moving the cursor never
+accumulates as drift the way `time.sleep(1 / fps)` per step does. The player
+sleeps until shortly before each deadline and then spins on `perf_counter`
+for the last stretch, because `sleep` alone can overshoot by a millisecond or
+more. If it falls more than a frame behind, it skips to the current frame
+rather than fast-forwarding.
+"""
+
+import time
+
+import numpy as np
+
+DEFAULT_FPS = 60
+SPIN_TIME = 0.002    # seconds before a deadline to stop sleeping and spin
+EASE = 0.15          # fraction of the duration spent speeding up (and slowing down)
+
+
+def ease_in_out(n, ease=EASE):
+    """Progress 0..1 over `n` frames with a trapezoidal speed profile.
+
+    Speed ramps up linearly over the first `ease` fraction, stays constant,
+    and ramps down over the last `ease` fraction; `ease=0` is uniform.
+    """
+    if n < 2:
+        return np.ones(n)
+    if not 0 <= ease <= 0.5:
+        raise ValueError(f'ease must be between 0 and 0.5, not {ease}')
+    t = np.linspace(0.0, 1.0, n)
+    if ease == 0:
+        return t
+    peak = 1.0 / (1.0 - ease)
+    head = 0.5 * peak * t * t / ease
+    tail = 1.0 - 0.5 * peak * (1.0 - t) ** 2 / ease
+    body = peak * (t - 0.5 * ease)
+    return np.where(t < ease, head, np.where(t > 1.0 - ease, tail, body))
+
+
+def frame_count(duration, fps):
+    return max(int(round(duration * fps)) + 1, 2)
+
+
+def to_pixels(points):
+    """Round float (x, y) rows to an int32 pixel path."""
+    return np.rint(points).astype(np.int32)
+
+
+def play(path, move_to, fps=DEFAULT_FPS, stop=None, spin=SPIN_TIME):
+    """Play `path` (N x 2) at `fps` against absolute deadlines.
+
+    `move_to(x, y)` is only called when the pixel position changes. `stop`
+    is an optional zero-argument callable checked every frame. Returns
+    playback statistics (achieved fps, lateness, jitter, dropped frames).
+    """
+    period = 1.0 / fps
+    n = len(path)
+    xs = path[:, 0].tolist()
+    ys = path[:, 1].tolist()
+    due = [0.0] * n          # actual time each played frame ran
+    late = [0.0] * n
+    played = []
+    dropped = 0
+    moves = 0
+    last = None
+
+    perf_counter = time.perf_counter
+    start = perf_counter()
+    i = 0
+    while i < n:
+        if stop is not None and stop():
+            break
+        deadline = start + i * period
+        remaining = deadline - perf_counter()
+        if remaining > spin:
+            time.sleep(remaining - spin)
+        while perf_counter() < deadline:
+            pass
+        now = perf_counter()
+
+        behind = int((now - deadline) / period)
+        if behind >= 1 and i + behind < n:
+            # more than a frame late: jump to the frame that is due now
+            dropped += behind
+            i += behind
+            deadline = start + i * period
+
+        point = (xs[i], ys[i])
+        if point != last:
+            move_to(*point)
+            moves += 1
+            last = point
+        due[i] = now
+        late[i] = now - deadline
+        played.append(i)
+        i += 1
+
+    return playback_stats(played, due, late, period, dropped, moves)
+
+
+def playback_stats(played, due, late, period, dropped=0, moves=0):
+    frames = len(played)
+    if frames < 2:
+        return {'fps': 0.0, 'target_fps': 1.0 / period, 'frames': frames, 'dropped': dropped,
+                'moves': moves, 'max_late_ms': 0.0, 'jitter_ms': 0.0}
+    times = np.array([due[i] for i in played])
+    lateness = np.array([late[i] for i in played])
+    intervals = np.diff(times)
+    return {
+        'fps': (frames - 1) / (times[-1] - times[0]),
+        'target_fps': 1.0 / period,
+        'frames': frames,
+        'dropped': dropped,
+        'moves': moves,
+        'max_late_ms': float(lateness.max()) * 1e3,
+        'jitter_ms': float(intervals.std()) * 1e3,
+    }
+
+
+def play_naive(path, move_to, fps=DEFAULT_FPS):
+    """The old loop (move, then sleep a full period), for comparison."""
+    period = 1.0 / fps
+    times = []
+    start = time.perf_counter()
+    for x, y in path.tolist():
+        times.append(time.perf_counter())
+        move_to(x, y)
+        time.sleep(period)
+    elapsed = time.perf_counter() - start
+    intervals = np.diff(times)
+    return {'fps': (len(times) - 1) / (times[-1] - times[0]), 'target_fps': fps,
+            'drift_ms': (elapsed - (len(path) - 1) * period) * 1e3,
+            'jitter_ms': float(intervals.std()) * 1e3}
+
+
+if __name__ == "__main__":
+    # Headless comparison of naive sleep pacing vs deadline playback.
+    from backends import VirtualBackend
+    from patterns import path as pattern_path
+
+    for fps in (30, 60, 120):
+        path = pattern_path('circle', (960, 540), duration=2.0, fps=fps, radius=100, rotations=2)
+        naive = play_naive(path, VirtualBackend(record=False).move_to, fps)
+        paced = play(path, VirtualBackend(record=False).move_to, fps)
+        print(f"{fps:>3} fps  sleep loop: {naive['fps']:6.1f} fps, drift {naive['drift_ms']:6.1f} ms, "
+              f"jitter {naive['jitter_ms']:.3f} ms | deadlines: {paced['fps']:6.1f} fps, "
+              f"max late {paced['max_late_ms']:.3f} ms, jitter {paced['jitter_ms']:.3f} ms, "
+              f"dropped {paced['dropped']}")